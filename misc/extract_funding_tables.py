@@ -9,6 +9,17 @@ import argparse
 import os
 from pathlib import Path
 
+# Compiled once at import; the filters run on every page of every scan.
+# All patterns are matched against the already-lowercased page text.
+MONEY_PATTERN = re.compile(r'\$\s*\d+|\d+\s*dollars?')
+YEAR_PATTERN = re.compile(r'\b19[0-4]\d\b')
+
+# Table indicators
+TABLE_INDICATORS = ('table', 'column')
+
+# Title/header keywords for detecting the start of a new section
+TITLE_KEYWORDS = ('table', 'chapter', 'section', 'part', 'appendix')
+
 def matches_funding_criteria(text):
     """
     Check if page text contains state funding of higher education content.
@@ -16,23 +27,18 @@ def matches_funding_criteria(text):
     """
     text_lower = text.lower()
 
-    # Primary keyword: receipts (commonly used in funding tables)
+    # Primary keyword: receipts (commonly used in funding tables);
+    # most pages fail here, so skip the rest
     has_receipts = 'receipts' in text_lower
+    if not has_receipts:
+        return False
 
-    # Table indicators
-    table_indicators = ['table', 'column']
-
-    # Check for table structure indicators
-    has_table_structure = any(indicator in text_lower for indicator in table_indicators)
-
-    # Look for monetary patterns (dollar amounts)
-    has_money_pattern = bool(re.search(r'\$\s*\d+', text)) or bool(re.search(r'\d+\s*dollars?', text_lower))
-
-    # Look for year patterns (1900-1949)
-    has_year_pattern = bool(re.search(r'\b19[0-4]\d\b', text))
-
-    # Require receipts keyword plus at least one other indicator
-    return has_receipts and (has_table_structure or has_money_pattern or has_year_pattern)
+    # Require at least one other indicator, checked cheapest first:
+    # table structure indicators, monetary patterns (dollar amounts),
+    # then year patterns (1900-1949)
+    return (any(indicator in text_lower for indicator in TABLE_INDICATORS)
+            or bool(MONEY_PATTERN.search(text_lower))
+            or bool(YEAR_PATTERN.search(text_lower)))
 
 def has_title_or_header(text):
     """
@@ -44,9 +50,7 @@ def has_title_or_header(text):
     first_section = text_lower[:300]
 
     # Look for common title/header keywords
-    title_keywords = ['table', 'chapter', 'section', 'part', 'appendix']
-
-    return any(keyword in first_section for keyword in title_keywords)
+    return any(keyword in first_section for keyword in TITLE_KEYWORDS)
 
 def extract_funding_pages(input_pdf_path, output_pdf_path):
     """
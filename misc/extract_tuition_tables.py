@@ -9,39 +9,40 @@ import argparse
 import os
 from pathlib import Path
 
+# Money and year patterns checked on every page of every scan
+MONEY_PATTERN = re.compile(r'\$\s*\d+|\d+\s*dollars?')
+YEAR_PATTERN = re.compile(r'\b19[0-4]\d\b')
+
+# Primary tuition keywords (lowercase, matched against lowercased page text)
+TUITION_KEYWORDS = (
+    'tuition', 'fees', 'charges', 'cost', 'expense',
+    'room and board', 'boarding', 'laboratory fee',
+    'registration fee', 'matriculation', 'diploma fee'
+)
+
+# Table indicators
+TABLE_INDICATORS = (
+    'table', 'column', 'per year', 'per semester',
+    'annual', 'quarterly', '$', 'dollar'
+)
+
 def matches_tuition_criteria(text):
     """
     Check if page text contains tuition-related content.
     """
     text_lower = text.lower()
 
-    # Primary tuition keywords
-    tuition_keywords = [
-        'tuition', 'fees', 'charges', 'cost', 'expense',
-        'room and board', 'boarding', 'laboratory fee',
-        'registration fee', 'matriculation', 'diploma fee'
-    ]
-
-    # Table indicators
-    table_indicators = [
-        'table', 'column', 'per year', 'per semester',
-        'annual', 'quarterly', '$', 'dollar'
-    ]
-
-    # Check for tuition keywords
-    has_tuition = any(keyword in text_lower for keyword in tuition_keywords)
-
-    # Check for table structure indicators
-    has_table_structure = any(indicator in text_lower for indicator in table_indicators)
-
-    # Look for monetary patterns (dollar amounts)
-    has_money_pattern = bool(re.search(r'\$\s*\d+', text)) or bool(re.search(r'\d+\s*dollars?', text_lower))
-
-    # Look for academic year patterns
-    has_year_pattern = bool(re.search(r'\b19[0-4]\d\b', text))
-
-    # Require tuition keyword plus at least one other indicator
-    return has_tuition and (has_table_structure or has_money_pattern or has_year_pattern)
+    # Check for tuition keywords; most pages fail here, so skip the rest
+    has_tuition = any(keyword in text_lower for keyword in TUITION_KEYWORDS)
+    if not has_tuition:
+        return False
+
+    # Require at least one other indicator, checked cheapest first:
+    # table structure indicators, monetary patterns (dollar amounts),
+    # then academic year patterns
+    return (any(indicator in text_lower for indicator in TABLE_INDICATORS)
+            or bool(MONEY_PATTERN.search(text_lower))
+            or bool(YEAR_PATTERN.search(text_lower)))
 
 def extract_tuition_pages(input_pdf_path, output_pdf_path):
     """
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Shared boto3 session and clients for the table pipeline scripts.
+
+Creating a client parses the service model and opens a new connection pool,
+so each (service, region) client is built once and reused. boto3 clients are
+thread-safe, so the same client can serve concurrent uploads and polls.
+"""
+
+import threading
+from functools import lru_cache
+
+import boto3
+from botocore.config import Config
+
+# Adaptive retries pace throttled calls instead of failing the job; the pool is
+# large enough for several multipart uploads in flight, and keepalive lets
+# idle connections survive between requests
+CLIENT_CONFIG = Config(
+    max_pool_connections=128,
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+# S3 Transfer Acceleration sends requests through the nearest CloudFront edge
+ACCELERATE_CONFIG = CLIENT_CONFIG.merge(Config(s3={'use_accelerate_endpoint': True}))
+
+_session = boto3.session.Session()
+
+# Session.client() is not safe to call from several threads at once
+_client_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_client(service_name, region_name=None, accelerate=False):
+    """
+    Return the shared client for an AWS service
+
+    Args:
+        service_name (str): AWS service name, e.g. 's3' or 'textract'
+        region_name (str, optional): AWS region. If None, uses the default region
+        accelerate (bool): Use the S3 Transfer Acceleration endpoint (S3 only)
+
+    Returns:
+        boto3 client for the service
+    """
+    with _client_lock:
+        config = ACCELERATE_CONFIG if accelerate else CLIENT_CONFIG
+        return _session.client(service_name, region_name=region_name, config=config)
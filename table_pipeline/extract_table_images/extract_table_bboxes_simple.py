@@ -6,32 +6,77 @@ This script uploads a PDF to S3, runs Textract analysis, and extracts
 bounding box coordinates for all detected tables using direct status polling.
 """
 
+import bisect
 import boto3
+from boto3.s3.transfer import TransferConfig
 import json
+import random
 import time
+import uuid
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any
 import sys
 import os
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from pypdf import PdfReader, PdfWriter
 
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+
+# Number of PDFs process_pdfs handles at once unless told otherwise
+DEFAULT_MAX_CONCURRENCY = 5
+
+# Upload large scans as concurrent 8 MB multipart chunks
+UPLOAD_CONCURRENCY = 10
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=UPLOAD_CONCURRENCY,
+    use_threads=True
+)
+
+# Let botocore pace and retry throttled calls instead of failing the job, and
+# give up on stalled connections rather than hanging a poll indefinitely.
+# Clients size their connection pool from this in __init__
+AWS_CLIENT_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    read_timeout=30,
+    connect_timeout=10
+)
+
 
 class TableBoundingBoxExtractor:
     """Extract table bounding boxes from PDF using AWS Textract."""
 
-    def __init__(self, bucket_name: str, region: str = 'us-east-2'):
+    def __init__(self, bucket_name: str, region: str = 'us-east-2',
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
         """
         Initialize the extractor.
 
         Args:
             bucket_name: S3 bucket name for temporary storage
             region: AWS region (default: us-east-2)
+            max_concurrency: Most PDFs that will be processed at once; sizes
+                the connection pools
         """
         self.bucket_name = bucket_name
         self.region = region
-        self.s3_client = boto3.client('s3', region_name=region)
-        self.textract_client = boto3.client('textract', region_name=region)
+        # Each PDF in flight uses up to UPLOAD_CONCURRENCY S3 connections
+        # during its multipart upload, and two Textract connections while the
+        # next result page is prefetched
+        s3_config = AWS_CLIENT_CONFIG.merge(
+            Config(max_pool_connections=max(10, max_concurrency * UPLOAD_CONCURRENCY)))
+        textract_config = AWS_CLIENT_CONFIG.merge(
+            Config(max_pool_connections=max(10, max_concurrency * 2)))
+        self.s3_client = boto3.client('s3', region_name=region, config=s3_config)
+        self.textract_client = boto3.client('textract', region_name=region,
+                                            config=textract_config)
 
     def split_pdf(self, pdf_path: str, max_pages: int, output_path: str) -> str:
         """
@@ -54,9 +99,10 @@ class TableBoundingBoxExtractor:
             print(f"PDF has only {total_pages} pages, using original file")
             return pdf_path
 
+        # append() copies the page range in one go and reuses the source's
+        # shared resources instead of cloning each page's object graph
         writer = PdfWriter()
-        for i in range(min(max_pages, total_pages)):
-            writer.add_page(reader.pages[i])
+        writer.append(reader, pages=(0, max_pages), import_outline=False)
 
         with open(output_path, 'wb') as output_file:
             writer.write(output_file)
@@ -78,10 +124,13 @@ class TableBoundingBoxExtractor:
         if not pdf_file.exists():
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
-        s3_key = f"temp/{pdf_file.name}"
+        # A unique prefix keeps runs on same-named files from overwriting or
+        # deleting each other's upload
+        s3_key = f"temp/{uuid.uuid4().hex}/{pdf_file.name}"
 
         print(f"Uploading {pdf_file.name} to S3...")
-        self.s3_client.upload_file(str(pdf_file), self.bucket_name, s3_key)
+        self.s3_client.upload_file(str(pdf_file), self.bucket_name, s3_key,
+                                   Config=S3_TRANSFER_CONFIG)
         print(f"Upload complete: s3://{self.bucket_name}/{s3_key}")
 
         return s3_key
@@ -112,21 +161,32 @@ class TableBoundingBoxExtractor:
         print(f"Job started: {job_id}")
         return job_id
 
-    def wait_for_completion(self, job_id: str, poll_interval: int = 5) -> bool:
+    def wait_for_completion(self, job_id: str, poll_interval: float = 0.5,
+                            max_poll_interval: float = 10.0,
+                            poll_multiplier: float = 2.0) -> bool:
         """
         Wait for Textract job to complete by polling status.
 
+        The delay between status checks starts at poll_interval and grows by
+        poll_multiplier (with full jitter) up to max_poll_interval, so short
+        jobs finish fast and long jobs don't spend Textract TPS on idle polls.
+        Status checks request a single block; the full results are fetched
+        afterwards by extract_table_bboxes.
+
         Args:
             job_id: Textract job ID
-            poll_interval: Seconds between status checks
+            poll_interval: Initial seconds between status checks
+            max_poll_interval: Upper bound on seconds between status checks
+            poll_multiplier: Factor applied to the delay after each check
 
         Returns:
             True if succeeded, False otherwise
         """
-        print("Waiting for job completion (polling every 5 seconds)...")
+        print(f"Waiting for job completion (polling with backoff up to {max_poll_interval:g} seconds)...")
 
+        delay = poll_interval
         while True:
-            response = self.textract_client.get_document_analysis(JobId=job_id)
+            response = self.textract_client.get_document_analysis(JobId=job_id, MaxResults=1)
             status = response['JobStatus']
 
             print(f"  Status: {status}")
@@ -138,54 +198,78 @@ class TableBoundingBoxExtractor:
                 print(f"Job failed: {response.get('StatusMessage', 'Unknown error')}")
                 return False
             elif status in ['IN_PROGRESS', 'PARTIAL_SUCCESS']:
-                time.sleep(poll_interval)
+                time.sleep(random.uniform(0, delay))
+                delay = min(delay * poll_multiplier, max_poll_interval)
             else:
                 print(f"Unexpected status: {status}")
                 return False
 
-    def extract_table_bboxes(self, job_id: str) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    def get_analysis_page(self, job_id: str, next_token: str = None) -> Dict[str, Any]:
         """
-        Extract table bounding boxes and titles from Textract results.
+        Fetch one page of Textract analysis results.
 
         Args:
             job_id: Textract job ID
+            next_token: Pagination token from the previous page, if any
 
         Returns:
-            Tuple of (tables list, all_blocks list)
+            get_document_analysis response
         """
-        print("Extracting table bounding boxes and titles...")
+        kwargs = {'JobId': job_id, 'MaxResults': 1000}
+        if next_token:
+            kwargs['NextToken'] = next_token
+        return self.textract_client.get_document_analysis(**kwargs)
 
-        all_blocks = []
-        next_token = None
-
-        # First, collect all blocks
-        while True:
-            # Get results
-            if next_token:
-                response = self.textract_client.get_document_analysis(
-                    JobId=job_id,
-                    NextToken=next_token
-                )
-            else:
-                response = self.textract_client.get_document_analysis(JobId=job_id)
-
-            all_blocks.extend(response.get('Blocks', []))
-
-            # Check for more pages
-            next_token = response.get('NextToken')
-            if not next_token:
-                break
+    def extract_table_bboxes(self, job_id: str) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Extract table bounding boxes and titles from Textract results.
 
-        # Create block lookup map
-        block_map = {block['Id']: block for block in all_blocks}
+        Args:
+            job_id: Textract job ID
 
-        # Extract table titles
-        title_blocks = [b for b in all_blocks if b.get('BlockType') == 'TABLE_TITLE']
+        Returns:
+            Tuple of (tables list, table blocks list). The second list holds
+            only the TABLE and TABLE_TITLE blocks and the CELL and WORD blocks
+            they reference, which is all the CSV extraction needs.
+        """
+        print("Extracting table bounding boxes and titles...")
 
-        # Create a map of page -> titles for matching
+        block_map = {}
+        title_blocks = []
+        table_blocks = []
+
+        # First, collect all blocks. The next results page is requested in the
+        # background while the current one is indexed, so parsing overlaps the
+        # Textract round-trip.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.get_analysis_page, job_id)
+            while future is not None:
+                response = future.result()
+
+                # Check for more pages and prefetch the next one
+                next_token = response.get('NextToken')
+                future = executor.submit(self.get_analysis_page, job_id, next_token) if next_token else None
+
+                blocks = response.get('Blocks', [])
+
+                # Create block lookup map and pick out titles and tables
+                # in the same pass
+                for block in blocks:
+                    block_map[block['Id']] = block
+                    block_type = block.get('BlockType')
+                    if block_type == 'TABLE_TITLE':
+                        title_blocks.append(block)
+                    elif block_type == 'TABLE':
+                        table_blocks.append(block)
+
+        # Create a map of page -> titles for matching. Title text is only
+        # resolved on pages that actually have a table.
+        table_pages = {block.get('Page') for block in table_blocks}
         page_titles = {}
         for title_block in title_blocks:
             page = title_block.get('Page')
+            if page not in table_pages:
+                continue
 
             # Get title text from child WORD blocks
             title_text = ''
@@ -208,54 +292,81 @@ class TableBoundingBoxExtractor:
                 'confidence': title_block.get('Confidence')
             })
 
+        # Sort each page's titles top-to-bottom so the closest title above a
+        # table can be found by binary search
+        page_title_tops = {}
+        for page, titles in page_titles.items():
+            titles.sort(key=lambda t: t['top'])
+            page_title_tops[page] = [t['top'] for t in titles]
+
         # Extract TABLE blocks with associated titles
         tables = []
-        for block in all_blocks:
-            if block['BlockType'] == 'TABLE':
-                # Extract bounding box
-                bbox = block.get('Geometry', {}).get('BoundingBox', {})
-                page = block.get('Page', None)
-                table_top = bbox.get('Top', 0)
-
-                table_info = {
-                    'id': block['Id'],
-                    'page': page,
-                    'confidence': block.get('Confidence', None),
-                    'bounding_box': {
-                        'left': bbox.get('Left', 0),
-                        'top': table_top,
-                        'width': bbox.get('Width', 0),
-                        'height': bbox.get('Height', 0)
-                    },
-                    'polygon': block.get('Geometry', {}).get('Polygon', []),
-                    'title': None,
-                    'title_confidence': None
-                }
-
-                # Find the closest title above the table on the same page
-                if page in page_titles:
-                    # Find titles above this table (title.top < table.top)
-                    titles_above = [t for t in page_titles[page] if t['top'] < table_top]
-
-                    # Get the closest one (highest top value that's still less than table top)
-                    if titles_above:
-                        closest_title = max(titles_above, key=lambda t: t['top'])
-                        table_info['title'] = closest_title['text']
-                        table_info['title_confidence'] = closest_title['confidence']
-
-                # Count rows and columns if relationships exist
-                if 'Relationships' in block:
-                    for relationship in block['Relationships']:
-                        if relationship['Type'] == 'CHILD':
-                            table_info['cell_ids'] = relationship['Ids']
+        for block in table_blocks:
+            # Extract bounding box
+            bbox = block.get('Geometry', {}).get('BoundingBox', {})
+            page = block.get('Page', None)
+            table_top = bbox.get('Top', 0)
+
+            table_info = {
+                'id': block['Id'],
+                'page': page,
+                'confidence': block.get('Confidence', None),
+                'bounding_box': {
+                    'left': bbox.get('Left', 0),
+                    'top': table_top,
+                    'width': bbox.get('Width', 0),
+                    'height': bbox.get('Height', 0)
+                },
+                'polygon': block.get('Geometry', {}).get('Polygon', []),
+                'title': None,
+                'title_confidence': None
+            }
 
-                tables.append(table_info)
+            # Find the closest title above the table on the same page
+            if page in page_titles:
+                # Get the closest one (highest top value that's still less than table top)
+                idx = bisect.bisect_left(page_title_tops[page], table_top) - 1
+                if idx >= 0:
+                    closest_title = page_titles[page][idx]
+                    table_info['title'] = closest_title['text']
+                    table_info['title_confidence'] = closest_title['confidence']
+
+            # Count rows and columns if relationships exist
+            if 'Relationships' in block:
+                for relationship in block['Relationships']:
+                    if relationship['Type'] == 'CHILD':
+                        table_info['cell_ids'] = relationship['Ids']
+
+            tables.append(table_info)
+
+        # Keep only the blocks reachable from tables (TABLE -> CELL -> WORD)
+        # plus the titles; the rest of the page text is never read downstream
+        needed_ids = {block['Id'] for block in title_blocks}
+        for block in table_blocks:
+            needed_ids.add(block['Id'])
+            for cell_id in self._child_ids(block):
+                needed_ids.add(cell_id)
+                cell_block = block_map.get(cell_id)
+                if cell_block:
+                    needed_ids.update(self._child_ids(cell_block))
+
+        table_related_blocks = [block for block in block_map.values() if block['Id'] in needed_ids]
 
         print(f"Found {len(tables)} tables and {len(title_blocks)} titles")
-        print(f"Saving {len(all_blocks)} total blocks (includes CELL and WORD blocks for text extraction)")
-        return tables, all_blocks
-
-    def process_pdf(self, pdf_path: str, output_path: str, max_pages: int = None):
+        print(f"Saving {len(table_related_blocks)} of {len(block_map)} blocks "
+              f"(TABLE, CELL and WORD blocks for text extraction)")
+        return tables, table_related_blocks
+
+    @staticmethod
+    def _child_ids(block: Dict[str, Any]) -> List[str]:
+        """Return the IDs of a block's CHILD relationships."""
+        ids = []
+        for relationship in block.get('Relationships', []):
+            if relationship['Type'] == 'CHILD':
+                ids.extend(relationship['Ids'])
+        return ids
+
+    def process_pdf(self, pdf_path: str, output_path: str, max_pages: int = None) -> Dict[str, Any]:
         """
         Complete workflow to extract table bounding boxes.
 
@@ -263,13 +374,19 @@ class TableBoundingBoxExtractor:
             pdf_path: Path to PDF file
             output_path: Path to save JSON output
             max_pages: Maximum number of pages to process
+
+        Returns:
+            The data saved to the JSON output
         """
         temp_pdf_path = None
+        s3_key = None
         try:
             # Split PDF if max_pages is specified
             pdf_to_upload = pdf_path
             if max_pages:
-                temp_pdf_path = f"/tmp/temp_pages_{int(time.time())}.pdf"
+                # Name the split after the source plus a random suffix so
+                # concurrent runs never share a temp file
+                temp_pdf_path = f"/tmp/{Path(pdf_path).stem}_pages_{uuid.uuid4().hex[:8]}.pdf"
                 pdf_to_upload = self.split_pdf(pdf_path, max_pages, temp_pdf_path)
 
             # Upload PDF to S3
@@ -285,10 +402,10 @@ class TableBoundingBoxExtractor:
                 print("ERROR: Textract job failed")
                 sys.exit(1)
 
-            # Extract bounding boxes and ALL blocks
-            tables, all_blocks = self.extract_table_bboxes(job_id)
+            # Extract bounding boxes and the blocks behind each table
+            tables, table_blocks = self.extract_table_bboxes(job_id)
 
-            # Save results including all blocks for text extraction later
+            # Save results including table blocks for text extraction later
             output_data = {
                 'pdf_file': Path(pdf_path).name,
                 's3_bucket': self.bucket_name,
@@ -296,11 +413,17 @@ class TableBoundingBoxExtractor:
                 'job_id': job_id,
                 'total_tables': len(tables),
                 'tables': tables,
-                'all_blocks': all_blocks  # Save all blocks for CSV extraction
+                # Despite the name, only the TABLE/TABLE_TITLE/CELL/WORD blocks of
+                # the tables above; the key is kept for existing JSON readers
+                'all_blocks': table_blocks
             }
 
-            with open(output_path, 'w') as f:
-                json.dump(output_data, f, indent=2)
+            if orjson is not None:
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(output_data))
+            else:
+                with open(output_path, 'w') as f:
+                    json.dump(output_data, f)
 
             print(f"\nResults saved to: {output_path}")
             print(f"Total tables found: {len(tables)}")
@@ -313,12 +436,73 @@ class TableBoundingBoxExtractor:
                       f"Title: {title_str}, "
                       f"Confidence: {table['confidence']:.1f}%")
 
+            return output_data
+
         finally:
             # Remove temporary PDF if it was created
             if temp_pdf_path and os.path.exists(temp_pdf_path):
                 os.remove(temp_pdf_path)
                 print(f"\nRemoved temporary PDF: {temp_pdf_path}")
 
+            # Remove the temporary upload; Textract has finished reading it
+            if s3_key:
+                try:
+                    self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+                    print(f"Removed temporary S3 object: s3://{self.bucket_name}/{s3_key}")
+                except ClientError as e:
+                    print(f"Warning: Could not remove temporary S3 object "
+                          f"s3://{self.bucket_name}/{s3_key}: {e}")
+
+    def process_pdfs(self, pdf_paths: List[str], output_dir: str, max_pages: int = None,
+                     max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> List[str]:
+        """
+        Run the workflow for several PDFs at once.
+
+        Each PDF spends most of its time waiting on S3 and Textract, so
+        overlapping documents hides that latency. The default concurrency
+        stays within Textract's Get* request quota.
+
+        Args:
+            pdf_paths: Paths to PDF files
+            output_dir: Directory to save one JSON file per PDF
+            max_pages: Maximum number of pages to process per PDF
+            max_concurrency: Number of PDFs to process at the same time
+
+        Returns:
+            Paths of the JSON files that were written
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {}
+            used_stems = set()
+            for pdf_path in pdf_paths:
+                # PDFs from different directories can share a name; number the
+                # repeats so their JSON files don't overwrite each other
+                stem = Path(pdf_path).stem
+                suffix = 2
+                while stem in used_stems:
+                    stem = f"{Path(pdf_path).stem}_{suffix}"
+                    suffix += 1
+                used_stems.add(stem)
+                if stem != Path(pdf_path).stem:
+                    print(f"Note: {pdf_path} shares its name with another input; saving as {stem}_textract.json")
+                json_path = str(output_path / f"{stem}_textract.json")
+                futures[executor.submit(self.process_pdf, pdf_path, json_path, max_pages)] = (pdf_path, json_path)
+
+            saved = []
+            for future, (pdf_path, json_path) in futures.items():
+                try:
+                    future.result()
+                    saved.append(json_path)
+                except (Exception, SystemExit) as e:
+                    # process_pdf exits on a failed job; keep the rest of the batch going
+                    print(f"ERROR: Failed to process {pdf_path}: {e}")
+
+        print(f"\nProcessed {len(saved)} of {len(pdf_paths)} PDFs")
+        return saved
+
 
 def main():
     """Main entry point."""
@@ -326,8 +510,9 @@ def main():
         description='Extract table bounding boxes from PDF using AWS Textract'
     )
     parser.add_argument(
-        'pdf_file',
-        help='Path to PDF file'
+        'pdf_files',
+        nargs='+',
+        help='Path to PDF file (several may be given for batch mode)'
     )
     parser.add_argument(
         'bucket_name',
@@ -338,6 +523,17 @@ def main():
         default='table_bboxes.json',
         help='Output JSON file path (default: table_bboxes.json)'
     )
+    parser.add_argument(
+        '--output-dir',
+        default='.',
+        help='Output directory when several PDFs are given (default: current directory)'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f'Number of PDFs to process at once in batch mode (default: {DEFAULT_MAX_CONCURRENCY})'
+    )
     parser.add_argument(
         '--max-pages',
         type=int,
@@ -352,8 +548,12 @@ def main():
     args = parser.parse_args()
 
     # Create extractor and process
-    extractor = TableBoundingBoxExtractor(args.bucket_name, args.region)
-    extractor.process_pdf(args.pdf_file, args.output, args.max_pages)
+    extractor = TableBoundingBoxExtractor(args.bucket_name, args.region, args.max_concurrency)
+    if len(args.pdf_files) == 1:
+        extractor.process_pdf(args.pdf_files[0], args.output, args.max_pages)
+    else:
+        extractor.process_pdfs(args.pdf_files, args.output_dir, args.max_pages,
+                               args.max_concurrency)
 
     print("\nDone!")
 
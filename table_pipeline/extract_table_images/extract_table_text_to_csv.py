@@ -10,44 +10,23 @@ import json
 import argparse
 from pathlib import Path
 import csv
-import re
-from typing import List, Dict, Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from typing import Dict, Any
 
+from sanitize import sanitize_filename
 
-def sanitize_filename(text: str, max_length: int = 100) -> str:
-    """
-    Sanitize text for use in filename.
-
-    Args:
-        text: Text to sanitize
-        max_length: Maximum filename length
-
-    Returns:
-        Sanitized filename string
-    """
-    if not text:
-        return "untitled"
-
-    # Remove or replace invalid filename characters
-    text = re.sub(r'[<>:"/\\|?*]', '', text)
-
-    # Replace spaces and periods with underscores
-    text = re.sub(r'[\s.]+', '_', text)
+try:
+    import orjson
+except ImportError:  # fall back to the standard library decoder
+    orjson = None
 
-    # Remove multiple consecutive underscores
-    text = re.sub(r'_+', '_', text)
+# Write buffer for CSV files, so large tables go out in few write calls
+CSV_BUFFER_SIZE = 1 << 20
 
-    # Remove leading/trailing underscores
-    text = text.strip('_')
 
-    # Truncate if too long
-    if len(text) > max_length:
-        text = text[:max_length].rstrip('_')
-
-    return text.lower() if text else "untitled"
-
-
-def extract_table_to_grid(table_id: str, block_map: Dict[str, Dict]) -> List[List[str]]:
+def extract_table_to_grid(table_id: str, block_map: Dict[str, Dict]) -> np.ndarray:
     """
     Extract table text organized as a 2D grid.
 
@@ -56,11 +35,11 @@ def extract_table_to_grid(table_id: str, block_map: Dict[str, Dict]) -> List[Lis
         block_map: Dictionary mapping block IDs to blocks
 
     Returns:
-        2D list representing the table grid
+        2D object array of cell text (empty if the table has no cells)
     """
     table_block = block_map.get(table_id)
     if not table_block:
-        return []
+        return np.empty((0, 0), dtype=object)
 
     # Get all cell IDs for this table
     cell_ids = []
@@ -71,7 +50,7 @@ def extract_table_to_grid(table_id: str, block_map: Dict[str, Dict]) -> List[Lis
                 break
 
     if not cell_ids:
-        return []
+        return np.empty((0, 0), dtype=object)
 
     # Collect cell information
     cells = []
@@ -113,35 +92,54 @@ def extract_table_to_grid(table_id: str, block_map: Dict[str, Dict]) -> List[Lis
         max_col = max(max_col, col_index + col_span - 1)
 
     # Build grid
-    grid = [['' for _ in range(max_col)] for _ in range(max_row)]
+    grid = np.full((max_row, max_col), '', dtype=object)
 
     # Fill grid with cell text
     for cell in cells:
         row = cell['row'] - 1  # Convert to 0-indexed
         col = cell['col'] - 1
-        text = cell['text']
 
-        # Handle merged cells by filling all spanned positions
-        for r in range(row, min(row + cell['row_span'], max_row)):
-            for c in range(col, min(col + cell['col_span'], max_col)):
-                if r < max_row and c < max_col:
-                    grid[r][c] = text
+        # Handle merged cells by filling all spanned positions in one slice
+        grid[row:min(row + cell['row_span'], max_row),
+             col:min(col + cell['col_span'], max_col)] = cell['text']
 
     return grid
 
 
-def process_json(json_path: str, output_dir: str):
+def write_csv(csv_path: Path, grid: np.ndarray):
+    """
+    Write a table grid to a CSV file.
+
+    Rows are streamed straight from the array rather than converted to
+    nested lists first, and the file uses a 1 MB buffer.
+
+    Args:
+        csv_path: Path of the CSV file to write
+        grid: 2D object array of cell text
+    """
+    with open(csv_path, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerows(grid)
+
+
+def process_json(json_path: str, output_dir: str, data: Dict[str, Any] = None):
     """
     Process JSON file and extract all tables to CSV.
 
     Args:
         json_path: Path to JSON file with table metadata and blocks
         output_dir: Directory to save CSV files
+        data: Already-loaded JSON data; skips reading json_path
     """
     # Load JSON data
-    print(f"Loading data from {json_path}...")
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+    if data is None:
+        print(f"Loading data from {json_path}...")
+        if orjson is not None:
+            with open(json_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(json_path, 'r') as f:
+                data = json.load(f)
 
     # Check if all_blocks exists in the JSON
     if 'all_blocks' not in data:
@@ -166,48 +164,54 @@ def process_json(json_path: str, output_dir: str):
     # Track filenames for duplicates
     filename_counts = {}
 
-    # Extract each table
-    for i, table_metadata in enumerate(tables, 1):
-        table_id = table_metadata['id']
-        page = table_metadata['page']
-        title = table_metadata.get('title', None)
-        confidence = table_metadata.get('confidence', 0)
-
-        title_str = f"\"{title}\"" if title else "No title"
-        print(f"\nExtracting Table {i}/{len(tables)}: Page {page}, Title: {title_str}")
-
-        # Extract table grid
-        grid = extract_table_to_grid(table_id, block_map)
-
-        if not grid:
-            print(f"  Warning: No cells found for table {i}")
-            continue
-
-        print(f"  Table size: {len(grid)} rows x {len(grid[0]) if grid else 0} columns")
-
-        # Create CSV filename matching PNG naming convention
-        if title:
-            sanitized_title = sanitize_filename(title, max_length=80)
-            base_filename = f"page_{page:03d}_{sanitized_title}"
-        else:
-            base_filename = f"page_{page:03d}_table_{i:03d}"
-
-        # Handle duplicate filenames
-        if base_filename in filename_counts:
-            filename_counts[base_filename] += 1
-            csv_filename = f"{base_filename}_{filename_counts[base_filename]}.csv"
-        else:
-            filename_counts[base_filename] = 0
-            csv_filename = f"{base_filename}.csv"
-
-        # Save to CSV
-        csv_path = output_path / csv_filename
-
-        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerows(grid)
-
-        print(f"  Saved: {csv_filename}")
+    # CSV writes run on a thread pool while the next grid is built;
+    # filenames are still assigned in table order
+    writes = []
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        # Extract each table
+        for i, table_metadata in enumerate(tables, 1):
+            table_id = table_metadata['id']
+            page = table_metadata['page']
+            title = table_metadata.get('title', None)
+            confidence = table_metadata.get('confidence', 0)
+
+            title_str = f"\"{title}\"" if title else "No title"
+            print(f"\nExtracting Table {i}/{len(tables)}: Page {page}, Title: {title_str}")
+
+            # Extract table grid
+            grid = extract_table_to_grid(table_id, block_map)
+
+            if grid.size == 0:
+                print(f"  Warning: No cells found for table {i}")
+                continue
+
+            print(f"  Table size: {grid.shape[0]} rows x {grid.shape[1]} columns")
+
+            # Create CSV filename matching PNG naming convention
+            if title:
+                sanitized_title = sanitize_filename(title, max_length=80)
+                base_filename = f"page_{page:03d}_{sanitized_title}"
+            else:
+                base_filename = f"page_{page:03d}_table_{i:03d}"
+
+            # Handle duplicate filenames
+            if base_filename in filename_counts:
+                filename_counts[base_filename] += 1
+                csv_filename = f"{base_filename}_{filename_counts[base_filename]}.csv"
+            else:
+                filename_counts[base_filename] = 0
+                csv_filename = f"{base_filename}.csv"
+
+            # Save to CSV
+            csv_path = output_path / csv_filename
+
+            writes.append(executor.submit(write_csv, csv_path, grid))
+
+            print(f"  Saving: {csv_filename}")
+
+    # Surface any failed write
+    for future in writes:
+        future.result()
 
     print(f"\nDone! Extracted {len(tables)} tables to {output_dir}")
 
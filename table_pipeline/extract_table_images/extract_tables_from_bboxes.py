@@ -9,46 +9,33 @@ and extracts each table as a separate image file.
 import json
 import argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from pdf2image import convert_from_path
 from PIL import Image
 import os
-import re
+from typing import Dict, Any
 
+from sanitize import sanitize_filename
 
-def sanitize_filename(text: str, max_length: int = 100) -> str:
-    """
-    Sanitize text for use in filename.
-
-    Args:
-        text: Text to sanitize
-        max_length: Maximum filename length
-
-    Returns:
-        Sanitized filename string
-    """
-    if not text:
-        return "untitled"
+try:
+    import orjson
+except ImportError:  # fall back to the standard library decoder
+    orjson = None
 
-    # Remove or replace invalid filename characters
-    text = re.sub(r'[<>:"/\\|?*]', '', text)
+# Resolution used to rasterize table pages
+DEFAULT_DPI = 300
 
-    # Replace spaces and periods with underscores
-    text = re.sub(r'[\s.]+', '_', text)
+# Pages rasterized at once; each conversion runs its own pdftoppm process, and
+# this also bounds how many pages are rendered ahead of the cropping
+RASTER_WORKERS = min(4, os.cpu_count() or 1)
 
-    # Remove multiple consecutive underscores
-    text = re.sub(r'_+', '_', text)
+# zlib level for table PNGs; level 1 encodes several times faster than the
+# default at a modest size cost
+PNG_COMPRESS_LEVEL = 1
 
-    # Remove leading/trailing underscores
-    text = text.strip('_')
 
-    # Truncate if too long
-    if len(text) > max_length:
-        text = text[:max_length].rstrip('_')
-
-    return text.lower() if text else "untitled"
-
-
-def extract_tables_from_pdf(pdf_path: str, bbox_json_path: str, output_dir: str, max_pages: int = None):
+def extract_tables_from_pdf(pdf_path: str, bbox_json_path: str, output_dir: str,
+                            dpi: int = DEFAULT_DPI, bbox_data: Dict[str, Any] = None):
     """
     Extract table images from PDF using bounding boxes.
 
@@ -56,7 +43,8 @@ def extract_tables_from_pdf(pdf_path: str, bbox_json_path: str, output_dir: str,
         pdf_path: Path to original PDF file
         bbox_json_path: Path to JSON file with bounding box data
         output_dir: Directory to save extracted table images
-        max_pages: Maximum pages to process (must match bbox extraction)
+        dpi: Resolution to rasterize table pages at
+        bbox_data: Already-loaded bounding box data; skips reading bbox_json_path
     """
     # Create output directory
     output_path = Path(output_dir)
@@ -64,69 +52,93 @@ def extract_tables_from_pdf(pdf_path: str, bbox_json_path: str, output_dir: str,
     print(f"Output directory: {output_dir}")
 
     # Load bounding box data
-    print(f"Loading bounding boxes from {bbox_json_path}...")
-    with open(bbox_json_path, 'r') as f:
-        bbox_data = json.load(f)
+    if bbox_data is None:
+        print(f"Loading bounding boxes from {bbox_json_path}...")
+        if orjson is not None:
+            with open(bbox_json_path, 'rb') as f:
+                bbox_data = orjson.loads(f.read())
+        else:
+            with open(bbox_json_path, 'r') as f:
+                bbox_data = json.load(f)
 
     tables = bbox_data['tables']
     print(f"Found {len(tables)} tables to extract")
 
-    # Convert PDF pages to images
-    print(f"Converting PDF to images (first {max_pages} pages)..." if max_pages else "Converting PDF to images...")
-
-    # Convert only the pages we need
-    if max_pages:
-        pages = convert_from_path(pdf_path, first_page=1, last_page=max_pages, dpi=300)
-    else:
-        pages = convert_from_path(pdf_path, dpi=300)
-
-    print(f"Converted {len(pages)} pages")
+    # Only pages that contain a table are rasterized, in parallel and in the
+    # order the tables need them, up to RASTER_WORKERS pages ahead. A page is
+    # dropped after its last table; when tables are not in page order, pages
+    # still waiting on a later table stay in memory as well.
+    page_order = list(dict.fromkeys(table['page'] for table in tables))
+    page_position = {page_num: k for k, page_num in enumerate(page_order)}
+    last_table_on_page = {table['page']: i for i, table in enumerate(tables, 1)}
+    print(f"Rasterizing {len(page_order)} pages that contain tables...")
+    page_images = {}
+    next_page = 0
+
+    def rasterize(page_num):
+        # Page numbers are 1-indexed in Textract and pdf2image
+        return convert_from_path(pdf_path, first_page=page_num, last_page=page_num, dpi=dpi)[0]
 
     # Track filenames to handle duplicates
     filename_counts = {}
 
-    # Extract each table
-    for i, table in enumerate(tables, 1):
-        page_num = table['page']
-        bbox = table['bounding_box']
-        confidence = table['confidence']
-        title = table.get('title', None)
-
-        title_str = f"\"{title}\"" if title else "No title"
-        print(f"\nExtracting Table {i}/{len(tables)}: Page {page_num}, Title: {title_str}, Confidence {confidence:.1f}%")
-
-        # Get the page image (page numbers are 1-indexed in Textract, 0-indexed in list)
-        page_image = pages[page_num - 1]
-        width, height = page_image.size
-
-        # Convert normalized coordinates to pixel coordinates
-        left_px = int(bbox['left'] * width)
-        top_px = int(bbox['top'] * height)
-        right_px = int((bbox['left'] + bbox['width']) * width)
-        bottom_px = int((bbox['top'] + bbox['height']) * height)
-
-        # Crop the table region
-        table_image = page_image.crop((left_px, top_px, right_px, bottom_px))
-
-        # Create filename with title if available
-        if title:
-            sanitized_title = sanitize_filename(title, max_length=80)
-            base_filename = f"page_{page_num:03d}_{sanitized_title}"
-        else:
-            base_filename = f"page_{page_num:03d}_table_{i:03d}"
-
-        # Handle duplicate filenames by adding a counter
-        if base_filename in filename_counts:
-            filename_counts[base_filename] += 1
-            output_filename = f"{base_filename}_{filename_counts[base_filename]}.png"
-        else:
-            filename_counts[base_filename] = 0
-            output_filename = f"{base_filename}.png"
-
-        output_filepath = output_path / output_filename
-        table_image.save(output_filepath, 'PNG')
-
-        print(f"  Saved: {output_filename} ({table_image.size[0]}x{table_image.size[1]} px)")
+    # PNG encoding and disk writes run on a thread pool while the next page
+    # is rasterized and cropped; filenames are still assigned in table order
+    saves = []
+    with ThreadPoolExecutor(max_workers=RASTER_WORKERS) as raster_executor, \
+            ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        # Extract each table
+        for i, table in enumerate(tables, 1):
+            page_num = table['page']
+            bbox = table['bounding_box']
+            confidence = table['confidence']
+            title = table.get('title', None)
+
+            title_str = f"\"{title}\"" if title else "No title"
+            print(f"\nExtracting Table {i}/{len(tables)}: Page {page_num}, Title: {title_str}, Confidence {confidence:.1f}%")
+
+            # Queue this page and the next few for rasterization, then wait for this one
+            while next_page < len(page_order) and next_page <= page_position[page_num] + RASTER_WORKERS:
+                page_images[page_order[next_page]] = raster_executor.submit(rasterize, page_order[next_page])
+                next_page += 1
+            page_image = page_images[page_num].result()
+            if last_table_on_page[page_num] == i:
+                del page_images[page_num]
+            width, height = page_image.size
+
+            # Convert normalized coordinates to pixel coordinates
+            left_px = int(bbox['left'] * width)
+            top_px = int(bbox['top'] * height)
+            right_px = int((bbox['left'] + bbox['width']) * width)
+            bottom_px = int((bbox['top'] + bbox['height']) * height)
+
+            # Crop the table region
+            table_image = page_image.crop((left_px, top_px, right_px, bottom_px))
+
+            # Create filename with title if available
+            if title:
+                sanitized_title = sanitize_filename(title, max_length=80)
+                base_filename = f"page_{page_num:03d}_{sanitized_title}"
+            else:
+                base_filename = f"page_{page_num:03d}_table_{i:03d}"
+
+            # Handle duplicate filenames by adding a counter
+            if base_filename in filename_counts:
+                filename_counts[base_filename] += 1
+                output_filename = f"{base_filename}_{filename_counts[base_filename]}.png"
+            else:
+                filename_counts[base_filename] = 0
+                output_filename = f"{base_filename}.png"
+
+            output_filepath = output_path / output_filename
+            saves.append(executor.submit(table_image.save, output_filepath, 'PNG',
+                                         compress_level=PNG_COMPRESS_LEVEL))
+
+            print(f"  Saving: {output_filename} ({table_image.size[0]}x{table_image.size[1]} px)")
+
+    # Surface any failed write
+    for future in saves:
+        future.result()
 
     print(f"\nDone! Extracted {len(tables)} tables to {output_dir}")
 
@@ -148,15 +160,23 @@ def main():
         'output_dir',
         help='Directory to save extracted table images'
     )
+    # Only pages listed in the bbox JSON are rendered, so this is no longer
+    # needed; still accepted so existing command lines keep working
     parser.add_argument(
         '--max-pages',
         type=int,
-        help='Maximum number of pages (must match bbox extraction)'
+        help=argparse.SUPPRESS
+    )
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        default=DEFAULT_DPI,
+        help=f'Resolution to render table pages at (default: {DEFAULT_DPI})'
     )
 
     args = parser.parse_args()
 
-    extract_tables_from_pdf(args.pdf_file, args.bbox_json, args.output_dir, args.max_pages)
+    extract_tables_from_pdf(args.pdf_file, args.bbox_json, args.output_dir, args.dpi)
 
 
 if __name__ == '__main__':
@@ -7,14 +7,21 @@ This program orchestrates the complete workflow:
 2. Extract table images as PNGs (saves to png/)
 3. Extract table text as CSVs (saves to csv/)
 
+Steps 2 and 3 both work from the data produced in step 1 and run concurrently.
+The steps are called in-process, so the Textract results from step 1 are
+handed straight to steps 2 and 3 instead of being re-read from disk.
+
 All outputs are organized in subdirectories within a specified output directory.
 """
 
 import argparse
-import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from extract_tables_from_bboxes import extract_tables_from_pdf
+from extract_table_text_to_csv import process_json
+
 
 def create_output_structure(output_dir: str) -> dict:
     """
@@ -42,25 +49,30 @@ def create_output_structure(output_dir: str) -> dict:
     return subdirs
 
 
-def run_command(cmd: list, description: str):
+def run_step(description: str, func, *args, **kwargs):
     """
-    Run a subprocess command and handle errors.
+    Run a pipeline step and handle errors.
 
     Args:
-        cmd: Command and arguments as list
-        description: Description of what the command does
+        description: Description of what the step does
+        func: Function that performs the step
+        *args, **kwargs: Arguments passed to func
+
+    Returns:
+        Whatever func returns
     """
     print(f"\n{'='*60}")
     print(f"Step: {description}")
     print(f"{'='*60}")
 
-    result = subprocess.run(cmd, capture_output=False, text=True)
-
-    if result.returncode != 0:
-        print(f"\nERROR: {description} failed with exit code {result.returncode}")
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        print(f"\nERROR: {description} failed: {e}")
         sys.exit(1)
 
     print(f"\n✓ {description} completed successfully")
+    return result
 
 
 def main():
@@ -101,6 +113,11 @@ This will create:
         type=int,
         help='Maximum number of pages to process (optional, for testing)'
     )
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        help='Resolution to render table images at (default: 300)'
+    )
     parser.add_argument(
         '--region',
         default='us-east-2',
@@ -124,9 +141,6 @@ This will create:
 
     args = parser.parse_args()
 
-    # Get the directory where this script is located
-    script_dir = Path(__file__).parent
-
     print(f"\n{'='*60}")
     print("Table Extraction Master Program")
     print(f"{'='*60}")
@@ -149,56 +163,51 @@ This will create:
     json_path = subdirs['json'] / json_filename
 
     # Step 1: Extract bounding boxes and metadata
+    bbox_data = None
     if not args.skip_bbox:
-        cmd = [
-            'python3',
-            str(script_dir / 'extract_table_bboxes_simple.py'),
-            args.pdf_file,
-            args.bucket_name,
-            '--output', str(json_path),
-            '--region', args.region
-        ]
-
-        if args.max_pages:
-            cmd.extend(['--max-pages', str(args.max_pages)])
-
-        run_command(cmd, "Extract table bounding boxes and metadata (Textract)")
+        # Imported here so --skip-bbox runs don't load boto3 and pypdf
+        from extract_table_bboxes_simple import TableBoundingBoxExtractor
+        extractor = TableBoundingBoxExtractor(args.bucket_name, args.region)
+        bbox_data = run_step("Extract table bounding boxes and metadata (Textract)",
+                             extractor.process_pdf, args.pdf_file, str(json_path), args.max_pages)
     else:
         print(f"\nSkipping bounding box extraction (using existing JSON)")
         if not json_path.exists():
             print(f"ERROR: JSON file not found: {json_path}")
             sys.exit(1)
 
+    # Steps 2 and 3 only read the data from step 1, so they run side by side
+    # (their console output interleaves)
+    steps = []
+
     # Step 2: Extract PNG images
     if not args.skip_png:
-        cmd = [
-            'python3',
-            str(script_dir / 'extract_tables_from_bboxes.py'),
-            args.pdf_file,
-            str(json_path),
-            str(subdirs['png'])
-        ]
-
-        if args.max_pages:
-            cmd.extend(['--max-pages', str(args.max_pages)])
-
-        run_command(cmd, "Extract table images (PNG)")
+        png_kwargs = {'bbox_data': bbox_data}
+        if args.dpi:
+            png_kwargs['dpi'] = args.dpi
+
+        steps.append(("Extract table images (PNG)", extract_tables_from_pdf,
+                      (args.pdf_file, str(json_path), str(subdirs['png'])),
+                      png_kwargs))
     else:
         print(f"\nSkipping PNG extraction")
 
     # Step 3: Extract CSV data
     if not args.skip_csv:
-        cmd = [
-            'python3',
-            str(script_dir / 'extract_table_text_to_csv.py'),
-            str(json_path),
-            str(subdirs['csv'])
-        ]
-
-        run_command(cmd, "Extract table text (CSV)")
+        steps.append(("Extract table text (CSV)", process_json,
+                      (str(json_path), str(subdirs['csv'])),
+                      {'data': bbox_data}))
     else:
         print(f"\nSkipping CSV extraction")
 
+    if steps:
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            futures = [executor.submit(run_step, description, func, *step_args, **step_kwargs)
+                       for description, func, step_args, step_kwargs in steps]
+        for future in futures:
+            # Re-raises the SystemExit from a failed step
+            future.result()
+
     # Summary
     print(f"\n{'='*60}")
     print("Extraction Complete!")
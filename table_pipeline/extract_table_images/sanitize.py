@@ -0,0 +1,46 @@
+"""
+Filename helpers shared by the PNG and CSV extraction scripts.
+
+Both scripts must turn a table title into the same filename so that each
+table's image and CSV line up, so the logic lives here once.
+"""
+
+import re
+
+# Compiled once at import; sanitize_filename runs for every table in both steps
+INVALID_CHARS_PATTERN = re.compile(r'[<>:"/\\|?*]')
+SEPARATOR_PATTERN = re.compile(r'[\s.]+')
+UNDERSCORE_RUN_PATTERN = re.compile(r'_+')
+
+
+def sanitize_filename(text: str, max_length: int = 100) -> str:
+    """
+    Sanitize text for use in filename.
+
+    Args:
+        text: Text to sanitize
+        max_length: Maximum filename length
+
+    Returns:
+        Sanitized filename string
+    """
+    if not text:
+        return "untitled"
+
+    # Remove or replace invalid filename characters
+    text = INVALID_CHARS_PATTERN.sub('', text)
+
+    # Replace spaces and periods with underscores
+    text = SEPARATOR_PATTERN.sub('_', text)
+
+    # Remove multiple consecutive underscores
+    text = UNDERSCORE_RUN_PATTERN.sub('_', text)
+
+    # Remove leading/trailing underscores
+    text = text.strip('_')
+
+    # Truncate if too long
+    if len(text) > max_length:
+        text = text[:max_length].rstrip('_')
+
+    return text.lower() if text else "untitled"
@@ -1,7 +1,53 @@
 #!/usr/bin/env python3
 import json
+import os
+import re
+import numpy as np
 import pandas as pd
 import argparse
+from collections import defaultdict
+from functools import lru_cache
+
+try:
+    import ijson
+except ImportError:  # fall back to loading the whole file
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library decoder
+    orjson = None
+
+# US states and territories (including common abbreviations); rows naming one
+# are never headers
+US_STATES = frozenset({
+    'ALABAMA', 'AL', 'ALASKA', 'AK', 'ARIZONA', 'AZ', 'ARKANSAS', 'AR',
+    'CALIFORNIA', 'CA', 'COLORADO', 'CO', 'CONNECTICUT', 'CT', 'DELAWARE', 'DE',
+    'FLORIDA', 'FL', 'GEORGIA', 'GA', 'HAWAII', 'HI', 'IDAHO', 'ID',
+    'ILLINOIS', 'IL', 'INDIANA', 'IN', 'IOWA', 'IA', 'KANSAS', 'KS',
+    'KENTUCKY', 'KY', 'LOUISIANA', 'LA', 'MAINE', 'ME', 'MARYLAND', 'MD',
+    'MASSACHUSETTS', 'MA', 'MICHIGAN', 'MI', 'MINNESOTA', 'MN', 'MISSISSIPPI', 'MS',
+    'MISSOURI', 'MO', 'MONTANA', 'MT', 'NEBRASKA', 'NE', 'NEVADA', 'NV',
+    'NEW HAMPSHIRE', 'NH', 'NEW JERSEY', 'NJ', 'NEW MEXICO', 'NM', 'NEW YORK', 'NY',
+    'NORTH CAROLINA', 'NC', 'NORTH DAKOTA', 'ND', 'OHIO', 'OH', 'OKLAHOMA', 'OK',
+    'OREGON', 'OR', 'PENNSYLVANIA', 'PA', 'RHODE ISLAND', 'RI', 'SOUTH CAROLINA', 'SC',
+    'SOUTH DAKOTA', 'SD', 'TENNESSEE', 'TN', 'TEXAS', 'TX', 'UTAH', 'UT',
+    'VERMONT', 'VT', 'VIRGINIA', 'VA', 'WASHINGTON', 'WA', 'WEST VIRGINIA', 'WV',
+    'WISCONSIN', 'WI', 'WYOMING', 'WY', 'DISTRICT OF COLUMBIA', 'DC',
+    'PUERTO RICO', 'PR', 'AMERICAN SAMOA', 'AS', 'GUAM', 'GU',
+    'NORTHERN MARIANA ISLANDS', 'MP', 'U.S. VIRGIN ISLANDS', 'VI'
+})
+
+# A cell counts as numeric if it parses as a number once thousands separators,
+# dollar and percent signs are removed. Matching a pattern avoids raising and
+# catching ValueError for every text cell.
+NUMBER_PATTERN = re.compile(r'\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*')
+
+# Any decimal digit, for spotting short rows that contain numbers
+DIGIT_PATTERN = re.compile(r'\d')
+
+# Bare column numbers ("1" through "22") that make up numbered header rows
+COLUMN_NUMBER_STRINGS = frozenset(str(i) for i in range(1, 23))
 
 def is_header_row(row):
     """
@@ -9,66 +55,144 @@ def is_header_row(row):
     """
     row_text = ' '.join(str(cell) for cell in row).strip()
     row_text_upper = row_text.upper()
-    
-    # List of US states and territories (including common abbreviations)
-    us_states = {
-        'ALABAMA', 'AL', 'ALASKA', 'AK', 'ARIZONA', 'AZ', 'ARKANSAS', 'AR',
-        'CALIFORNIA', 'CA', 'COLORADO', 'CO', 'CONNECTICUT', 'CT', 'DELAWARE', 'DE',
-        'FLORIDA', 'FL', 'GEORGIA', 'GA', 'HAWAII', 'HI', 'IDAHO', 'ID',
-        'ILLINOIS', 'IL', 'INDIANA', 'IN', 'IOWA', 'IA', 'KANSAS', 'KS',
-        'KENTUCKY', 'KY', 'LOUISIANA', 'LA', 'MAINE', 'ME', 'MARYLAND', 'MD',
-        'MASSACHUSETTS', 'MA', 'MICHIGAN', 'MI', 'MINNESOTA', 'MN', 'MISSISSIPPI', 'MS',
-        'MISSOURI', 'MO', 'MONTANA', 'MT', 'NEBRASKA', 'NE', 'NEVADA', 'NV',
-        'NEW HAMPSHIRE', 'NH', 'NEW JERSEY', 'NJ', 'NEW MEXICO', 'NM', 'NEW YORK', 'NY',
-        'NORTH CAROLINA', 'NC', 'NORTH DAKOTA', 'ND', 'OHIO', 'OH', 'OKLAHOMA', 'OK',
-        'OREGON', 'OR', 'PENNSYLVANIA', 'PA', 'RHODE ISLAND', 'RI', 'SOUTH CAROLINA', 'SC',
-        'SOUTH DAKOTA', 'SD', 'TENNESSEE', 'TN', 'TEXAS', 'TX', 'UTAH', 'UT',
-        'VERMONT', 'VT', 'VIRGINIA', 'VA', 'WASHINGTON', 'WA', 'WEST VIRGINIA', 'WV',
-        'WISCONSIN', 'WI', 'WYOMING', 'WY', 'DISTRICT OF COLUMBIA', 'DC',
-        'PUERTO RICO', 'PR', 'AMERICAN SAMOA', 'AS', 'GUAM', 'GU',
-        'NORTHERN MARIANA ISLANDS', 'MP', 'U.S. VIRGIN ISLANDS', 'VI'
-    }
+    cells = [str(cell).strip() for cell in row]
     
     # Check if any cell in the row resembles a state name
-    for cell in row:
-        cell_text = str(cell).strip().upper()
-        if cell_text in us_states:
+    for cell_text in cells:
+        if cell_text.upper() in US_STATES:
             return False  # Don't classify as header if it contains a state name
     
+    # Check for common header patterns, cheapest first, stopping at the first match
+    if (row_text.isdigit()  # Rows with just numbers like "1 2 3 4 5"
+            or 'TABLE' in row_text_upper
+            or 'LOCATION.' in row_text_upper
+            or 'INSTITUTION.' in row_text_upper
+            or 'FOR MEN, FOR WOMEN' in row_text_upper
+            or 'CONTROL.' in row_text_upper
+            or ('MEN.' in row_text_upper and 'WOMEN.' in row_text_upper)
+            or 'VALUE' in row_text_upper
+            or (len(row_text) < 10 and DIGIT_PATTERN.search(row_text))):  # Short rows with numbers
+        return True
+    
+    # Check if row contains mostly single digits or column numbers
+    column_number_limit = len(row) * 0.5
+    column_numbers = 0
+    for cell_text in cells:
+        if cell_text in COLUMN_NUMBER_STRINGS:
+            column_numbers += 1
+            if column_numbers > column_number_limit:
+                return True
+    
     # Check if row is primarily comprised of string variables (non-numeric content)
-    non_empty_cells = [str(cell).strip() for cell in row if str(cell).strip()]
-    if len(non_empty_cells) == 0:
-        string_ratio = 0
+    non_empty_cells = [cell_text for cell_text in cells if cell_text]
+    if not non_empty_cells:
+        return False
+    
+    # Count cells that are not numbers (considering various formats)
+    string_cells = sum(
+        1 for cell in non_empty_cells
+        if not NUMBER_PATTERN.fullmatch(cell.replace(',', '').replace('$', '').replace('%', ''))
+    )
+    
+    # Header if row is primarily strings (>= 50% non-numeric content)
+    return string_cells / len(non_empty_cells) >= 0.5
+
+def iter_textract_blocks(json_file_path):
+    """
+    Yield the blocks of a Textract JSON file one at a time.
+    
+    NDJSON files (.jsonl, one block per line) are read line by line. Regular
+    JSON is parsed in one go with orjson when it is available; load_block_index
+    keeps the CELL and WORD blocks anyway, so orjson's speed matters more than
+    streaming. Without orjson, ijson streams the 'Blocks' array so LINE, PAGE
+    and other blocks are never all held at once, and the standard library
+    parser is the last resort.
+    
+    Args:
+        json_file_path: Path to the JSON or NDJSON file
+    """
+    if str(json_file_path).endswith('.jsonl'):
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(json_file_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+    elif orjson is not None:
+        with open(json_file_path, 'rb') as f:
+            data = orjson.loads(f.read())
+        yield from data.get('Blocks', [])
+    elif ijson is not None:
+        with open(json_file_path, 'rb') as f:
+            yield from ijson.items(f, 'Blocks.item')
     else:
-        string_cells = 0
-        for cell in non_empty_cells:
-            # Check if cell is not a number (considering various formats)
-            try:
-                float(cell.replace(',', '').replace('$', '').replace('%', ''))
-                # It's a number
-            except ValueError:
-                # It's a string/text
-                string_cells += 1
-        string_ratio = string_cells / len(non_empty_cells)
-    
-    # Check for common header patterns
-    header_indicators = [
-        row_text.isdigit(),  # Rows with just numbers like "1 2 3 4 5"
-        'TABLE' in row_text_upper,
-        'LOCATION.' in row_text_upper,
-        'INSTITUTION.' in row_text_upper,
-        'FOR MEN, FOR WOMEN' in row_text_upper,
-        'CONTROL.' in row_text_upper,
-        'MEN.' in row_text_upper and 'WOMEN.' in row_text_upper,
-        'VALUE' in row_text_upper,
-        len(row_text) < 10 and any(char.isdigit() for char in row_text),  # Short rows with numbers
-        # Check if row contains mostly single digits or column numbers
-        len([cell for cell in row if str(cell).strip() in ['1','2','3','4','5','6','7','8','9','10','11','12','13','14','15','16','17','18','19','20','21','22']]) > len(row) * 0.5,
-        # Check if row is primarily strings (>= 30% non-numeric content)
-        string_ratio >= 0.5
-    ]
-    
-    return any(header_indicators)
+        with open(json_file_path, 'r') as f:
+            data = json.load(f)
+        yield from data.get('Blocks', [])
+
+def load_block_index(json_file_path):
+    """
+    Index a Textract JSON file for table extraction.
+    
+    The last two indexes are cached by path and modification time, so
+    extracting several page ranges from the same file only parses it once
+    without keeping every document of a batch in memory.
+    
+    Args:
+        json_file_path: Path to the JSON file
+    
+    Returns:
+        Tuple of (WORD ID -> text dict, page -> CELL blocks dict, max page number)
+    """
+    return _load_block_index(os.path.abspath(json_file_path), os.path.getmtime(json_file_path))
+
+@lru_cache(maxsize=2)
+def _load_block_index(json_file_path, mtime):
+    """Build the index for load_block_index; mtime is only part of the cache key"""
+    # Map WORD IDs to their text and bucket CELL blocks by page in a single pass
+    word_text = {}
+    cells_by_page = defaultdict(list)
+    max_page = 0
+    for block in iter_textract_blocks(json_file_path):
+        page_num = block.get('Page', 0)
+        if page_num > max_page:
+            max_page = page_num
+        block_type = block.get('BlockType')
+        if block_type == 'WORD':
+            word_text[block['Id']] = block.get('Text', '')
+        elif block_type == 'CELL':
+            cells_by_page[page_num].append(block)
+    
+    return word_text, dict(cells_by_page), max_page
+
+def build_page_rows(page_num, cells):
+    """
+    Build the output rows for one page of table cells.
+    
+    Args:
+        page_num: Page number
+        cells: List of (row_index, column_index, text) tuples, 1-indexed
+    
+    Returns:
+        List of rows, each prefixed with the page number and header indicator
+    """
+    # Create table matrix for this page
+    max_row = max(row_index for row_index, _, _ in cells)
+    max_col = max(col_index for _, col_index, _ in cells)
+    
+    table_matrix = np.full((max_row, max_col), '', dtype=object)
+    
+    # Fill matrix with cell text
+    for row_index, col_index, cell_text in cells:
+        table_matrix[row_index - 1, col_index - 1] = cell_text.strip()
+    
+    # Add ALL rows from this page with page number and header indicator as first columns
+    page_rows = []
+    for row in table_matrix.tolist():
+        # Add page number as first column, header indicator (1 if header, 0 if not) as second column
+        header_indicator = 1 if is_header_row(row) else 0
+        page_rows.append([page_num, header_indicator] + row)
+    
+    return page_rows
 
 def extract_raw_table_data(json_file_path, page_ranges=None):
     """
@@ -85,17 +209,7 @@ def extract_raw_table_data(json_file_path, page_ranges=None):
         If page_ranges is provided: Dict mapping range descriptions to row lists
     """
     
-    with open(json_file_path, 'r') as f:
-        data = json.load(f)
-    
-    blocks = data.get('Blocks', [])
-    
-    # Get all pages
-    max_page = 0
-    for block in blocks:
-        page_num = block.get('Page', 0)
-        if page_num > max_page:
-            max_page = page_num
+    word_text, cells_by_page, max_page = load_block_index(json_file_path)
     
     print(f"Found {max_page} total pages in document")
     
@@ -117,43 +231,24 @@ def extract_raw_table_data(json_file_path, page_ranges=None):
     for start_page, end_page, range_name in pages_to_process:
         range_rows = []
         
-        # Extract from specified page range
         for page_num in range(start_page, end_page + 1):
-            # Find cells for this page
-            cells = [block for block in blocks if block.get('BlockType') == 'CELL' and block.get('Page') == page_num]
+            cells = cells_by_page.get(page_num, [])
             
             if not cells:
                 print(f"No cells found on page {page_num}")
                 continue
             
-            # Create table matrix for this page
-            max_row = max(cell.get('RowIndex', 0) for cell in cells)
-            max_col = max(cell.get('ColumnIndex', 0) for cell in cells)
-            
-            table_matrix = [['' for _ in range(max_col)] for _ in range(max_row)]
-            
-            # Fill matrix with cell text
-            for cell in cells:
-                row_idx = cell.get('RowIndex', 1) - 1
-                col_idx = cell.get('ColumnIndex', 1) - 1
-                
-                cell_text = ''
-                if 'Relationships' in cell:
-                    for rel in cell['Relationships']:
-                        if rel['Type'] == 'CHILD':
-                            for child_id in rel['Ids']:
-                                child_block = next((b for b in blocks if b['Id'] == child_id), None)
-                                if child_block and child_block.get('BlockType') == 'WORD':
-                                    cell_text += child_block.get('Text', '') + ' '
-                
-                table_matrix[row_idx][col_idx] = cell_text.strip()
-            
-            # Add ALL rows from this page with page number and header indicator as first columns
-            for row in table_matrix:
-                # Add page number as first column, header indicator (1 if header, 0 if not) as second column
-                header_indicator = 1 if is_header_row(row) else 0
-                row_with_indicators = [page_num, header_indicator] + row
-                range_rows.append(row_with_indicators)
+            # Join each cell's child WORDs (other child types are not in word_text)
+            range_rows.extend(build_page_rows(page_num, [
+                (cell.get('RowIndex', 1), cell.get('ColumnIndex', 1), ' '.join(
+                    word_text[child_id]
+                    for rel in cell.get('Relationships', ())
+                    if rel['Type'] == 'CHILD'
+                    for child_id in rel['Ids']
+                    if child_id in word_text
+                ))
+                for cell in cells
+            ]))
         
         # Store results for this range
         if page_ranges is None:
@@ -185,15 +280,11 @@ def process_and_save_data(table_data, output_base_path, range_name=None):
     max_cols = max(len(row) for row in table_data) if table_data else 0
     print(f"Maximum columns found: {max_cols}")
     
-    # Standardize all rows to have the same number of columns
-    standardized_data = []
-    for row in table_data:
-        if len(row) < max_cols:
-            # Pad with empty strings
-            padded_row = row + [''] * (max_cols - len(row))
-        else:
-            padded_row = row[:max_cols]  # Truncate if longer
-        standardized_data.append(padded_row)
+    # Standardize all rows to have the same number of columns by copying each
+    # row into a preallocated grid of empty strings
+    standardized_data = np.full((len(table_data), max_cols), '', dtype=object)
+    for i, row in enumerate(table_data):
+        standardized_data[i, :len(row)] = row
     
     # Keep all rows including the first row
     
@@ -206,8 +297,10 @@ def process_and_save_data(table_data, output_base_path, range_name=None):
     else:
         output_file = output_base_path
     
-    # Save to CSV without headers
-    df.to_csv(output_file, index=False, header=False)
+    # Save to CSV without headers through a 1 MB buffer so rows go out in
+    # large writes
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        df.to_csv(f, index=False, header=False, chunksize=10000)
     
     print(f"Saved: {df.shape[0]} rows, {df.shape[1]} columns to {output_file}")
     return output_file
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 import os
 import sys
+import uuid
 from pathlib import Path
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Import the modules directly
 from pdf_to_s3_uploader import upload_pdf_to_s3
-from s3_textract_async import S3TextractProcessor, ProcessType
+from s3_textract_async import S3TextractProcessor, ProcessType, TextractNotificationChannel
 from extract_table_raw import extract_raw_table_data, process_and_save_data
 
 class TablePipelineProcessor:
@@ -23,7 +25,8 @@ class TablePipelineProcessor:
         self.s3_bucket = s3_bucket
         self.aws_region = aws_region
     
-    def process_pdf_pipeline(self, pdf_file_path, page_ranges_str=None, output_csv_path=None, json_output_path=None):
+    def process_pdf_pipeline(self, pdf_file_path, page_ranges_str=None, output_csv_path=None, json_output_path=None,
+                             notification_channel=None):
         """
         Complete pipeline: PDF upload -> Textract analysis -> CSV extraction
         
@@ -32,6 +35,8 @@ class TablePipelineProcessor:
             page_ranges_str (str): Page ranges in format "1-3,4-6" (optional)
             output_csv_path (str): Output CSV file path (optional)
             json_output_path (str): Output JSON file path (optional)
+            notification_channel (TextractNotificationChannel): Shared SNS topic and
+                                                                SQS queue (optional)
         
         Returns:
             str: Path to the generated CSV file if successful, None otherwise
@@ -42,8 +47,10 @@ class TablePipelineProcessor:
         print("STEP 1: UPLOADING PDF TO S3")
         print("=" * 60)
         
+        # A unique prefix keeps concurrent runs on same-named PDFs from
+        # overwriting each other's upload
         pdf_name = Path(pdf_file_path).name
-        s3_key = f"documents/{pdf_name}"
+        s3_key = f"documents/{uuid.uuid4().hex}/{pdf_name}"
         
         upload_success = upload_pdf_to_s3(pdf_file_path, self.s3_bucket, s3_key)
         if not upload_success:
@@ -63,7 +70,12 @@ class TablePipelineProcessor:
             json_output = f"{document_name}_textract_results.json"
         
         try:
-            processor = S3TextractProcessor(self.aws_role_arn, self.s3_bucket, s3_key, self.aws_region)
+            if notification_channel:
+                processor = S3TextractProcessor(self.aws_role_arn, self.s3_bucket, s3_key, self.aws_region,
+                                                sns_topic_arn=notification_channel.snsTopicArn,
+                                                sqs_queue_url=notification_channel.sqsQueueUrl)
+            else:
+                processor = S3TextractProcessor(self.aws_role_arn, self.s3_bucket, s3_key, self.aws_region)
             results = processor.process_document_complete_workflow(
                 output_file=json_output,
                 process_type=ProcessType.ANALYSIS,
@@ -128,6 +140,46 @@ class TablePipelineProcessor:
         print("❌ Pipeline completed but no CSV files were generated")
         return None
 
+    def process_batch(self, pdf_file_paths, page_ranges_str=None, max_concurrency=5):
+        """
+        Run the pipeline for several PDFs concurrently
+        
+        Each document spends most of its time waiting on S3 and Textract, so
+        running them side by side overlaps that waiting. All Textract jobs
+        report to one SNS topic and SQS queue, created once for the batch.
+        Output files are named after each PDF; PDFs that share a name get
+        _2, _3, ... appended so their outputs don't overwrite each other.
+        
+        Args:
+            pdf_file_paths (list): Paths to the PDF files to process
+            page_ranges_str (str): Page ranges in format "1-3,4-6" (optional)
+            max_concurrency (int): Number of PDFs to process at the same time
+        
+        Returns:
+            list: (PDF path, generated CSV path or None if it failed) pairs, in input order
+        """
+        with TextractNotificationChannel(self.aws_region) as channel, \
+                ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = []
+            used_names = set()
+            for pdf_file_path in pdf_file_paths:
+                document_name = Path(pdf_file_path).stem
+                suffix = 2
+                while document_name in used_names:
+                    document_name = f"{Path(pdf_file_path).stem}_{suffix}"
+                    suffix += 1
+                used_names.add(document_name)
+                if document_name != Path(pdf_file_path).stem:
+                    print(f"Note: {pdf_file_path} shares its name with another input; "
+                          f"saving outputs as {document_name}_*")
+                
+                futures.append((pdf_file_path, executor.submit(
+                    self.process_pdf_pipeline, pdf_file_path, page_ranges_str,
+                    output_csv_path=f"{document_name}_extracted_tables.csv",
+                    json_output_path=f"{document_name}_textract_results.json",
+                    notification_channel=channel)))
+        return [(pdf_file_path, future.result()) for pdf_file_path, future in futures]
+
 def main():
     parser = argparse.ArgumentParser(
         description='Complete PDF table extraction pipeline: PDF -> S3 -> Textract -> CSV',
@@ -143,38 +195,56 @@ Examples:
   # Custom output file
   python master_program.py document.pdf my-bucket arn:aws:iam::123:role/TextractRole --output results.csv
 
+  # Several PDFs at once (outputs are named after each PDF)
+  python master_program.py a.pdf b.pdf c.pdf my-bucket arn:aws:iam::123:role/TextractRole
+
 Note: The IAM role must have permissions for:
   - s3:GetObject and s3:PutObject on your bucket
   - sns:CreateTopic, sns:DeleteTopic, sns:Publish
-  - sqs:CreateQueue, sqs:DeleteQueue, sqs:ReceiveMessage, sqs:DeleteMessage
+  - sqs:CreateQueue, sqs:DeleteQueue, sqs:ReceiveMessage, sqs:DeleteMessage,
+    sqs:ChangeMessageVisibility
   - textract:StartDocumentAnalysis, textract:GetDocumentAnalysis
         """
     )
     
-    parser.add_argument('pdf_file', help='Path to the PDF file to process')
+    parser.add_argument('pdf_files', nargs='+', help='Path to the PDF file(s) to process')
     parser.add_argument('s3_bucket', help='S3 bucket name for document storage')
     parser.add_argument('aws_role_arn', help='IAM role ARN for Textract access')
     parser.add_argument('--page-ranges', '-p', help='Page ranges as "1-3,4-6,7-10" (optional)')
     parser.add_argument('--output', '-o', help='Output CSV file path (optional)')
     parser.add_argument('--json-output', '-j', help='Output JSON file path (optional)')
     parser.add_argument('--region', '-r', default='us-east-2', help='AWS region (default: us-east-2)')
+    parser.add_argument('--max-concurrency', type=int, default=5,
+                       help='PDFs to process at once when several are given (default: 5)')
     
     args = parser.parse_args()
     
-    # Validate PDF file exists
-    if not os.path.exists(args.pdf_file):
-        print(f"❌ Error: PDF file '{args.pdf_file}' not found")
-        sys.exit(1)
+    # Validate PDF files exist
+    for pdf_file in args.pdf_files:
+        if not os.path.exists(pdf_file):
+            print(f"❌ Error: PDF file '{pdf_file}' not found")
+            sys.exit(1)
     
     # Create processor and run pipeline
     processor = TablePipelineProcessor(args.aws_role_arn, args.s3_bucket, args.region)
     
-    result = processor.process_pdf_pipeline(
-        pdf_file_path=args.pdf_file,
-        page_ranges_str=args.page_ranges,
-        output_csv_path=args.output,
-        json_output_path=args.json_output
-    )
+    if len(args.pdf_files) == 1:
+        result = processor.process_pdf_pipeline(
+            pdf_file_path=args.pdf_files[0],
+            page_ranges_str=args.page_ranges,
+            output_csv_path=args.output,
+            json_output_path=args.json_output
+        )
+    else:
+        if args.output or args.json_output:
+            print("❌ Error: --output and --json-output only apply to a single PDF")
+            sys.exit(1)
+        
+        results = processor.process_batch(args.pdf_files, args.page_ranges, args.max_concurrency)
+        failed = [pdf_file for pdf_file, output in results if not output]
+        for pdf_file in failed:
+            print(f"❌ Pipeline failed for {pdf_file}")
+        result = not failed
     
     if result:
         print(f"\n🎉 Pipeline completed successfully!")
@@ -1,12 +1,108 @@
 #!/usr/bin/env python3
 
-import boto3
+import hashlib
 import os
 import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from botocore.exceptions import ClientError, NoCredentialsError
 
-def upload_pdf_to_s3(pdf_file_path, bucket_name, s3_key=None):
+# Multipart defaults for scanned PDFs: files over 8 MB go up in 50 MB parts,
+# 16 at a time
+MULTIPART_THRESHOLD_MB = 8
+PART_SIZE_MB = 50
+UPLOAD_CONCURRENCY = 16
+
+# Number of files upload_multiple_pdfs sends at the same time
+MAX_PARALLEL_UPLOADS = 8
+
+# Every PDF starts with this marker; readers accept it anywhere in the first KB
+PDF_SIGNATURE = b'%PDF-'
+PDF_SIGNATURE_WINDOW = 1024
+
+# Block size for hashing local files when comparing against S3 ETags
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def get_s3_client(accelerate=False):
+    """
+    Return the shared S3 client, importing boto3 on first use
+    
+    boto3 takes a few hundred milliseconds to import, so the usage message and
+    argument errors return without loading it.
+    
+    Args:
+        accelerate (bool): Use the S3 Transfer Acceleration endpoint
+    
+    Returns:
+        boto3 S3 client
+    """
+    from aws_clients import get_client
+    return get_client('s3', accelerate=accelerate)
+
+def expected_etag(file_path, part_size):
+    """
+    Compute the ETag S3 assigns to a file uploaded by upload_pdf_to_s3
+    
+    Single-part uploads get the file's MD5. Multipart uploads get the MD5 of
+    the concatenated part MD5s followed by "-<number of parts>".
+    
+    Args:
+        file_path (str): Path to the local file
+        part_size (int): Multipart part size in bytes
+    
+    Returns:
+        str: ETag without surrounding quotes
+    """
+    if os.path.getsize(file_path) < MULTIPART_THRESHOLD_MB * 1024 * 1024:
+        md5 = hashlib.md5()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                md5.update(block)
+        return md5.hexdigest()
+    
+    part_digests = []
+    with open(file_path, 'rb') as f:
+        while True:
+            part_md5 = hashlib.md5()
+            remaining = part_size
+            while remaining:
+                block = f.read(min(HASH_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                part_md5.update(block)
+                remaining -= len(block)
+            if remaining == part_size:
+                break
+            part_digests.append(part_md5.digest())
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+def is_already_uploaded(pdf_file_path, bucket_name, s3_key, s3_client, part_size):
+    """
+    Check whether s3://bucket_name/s3_key already holds this exact file
+    
+    Args:
+        pdf_file_path (str): Path to the local PDF file
+        bucket_name (str): Name of the S3 bucket
+        s3_key (str): S3 object key
+        s3_client: S3 client to use
+        part_size (int): Multipart part size in bytes used for uploads
+    
+    Returns:
+        bool: True if the object exists with the same size and ETag
+    """
+    try:
+        head = s3_client.head_object(Bucket=bucket_name, Key=s3_key)
+    except ClientError:
+        return False
+    
+    # Cheap size check first; hash the file only when the sizes agree
+    if head['ContentLength'] != os.path.getsize(pdf_file_path):
+        return False
+    return head['ETag'].strip('"') == expected_etag(pdf_file_path, part_size)
+
+def upload_pdf_to_s3(pdf_file_path, bucket_name, s3_key=None, part_size_mb=PART_SIZE_MB,
+                     concurrency=UPLOAD_CONCURRENCY, s3_client=None, skip_validation=False,
+                     skip_existing=False):
     """
     Upload a PDF file to Amazon S3
     
@@ -14,19 +110,39 @@ def upload_pdf_to_s3(pdf_file_path, bucket_name, s3_key=None):
         pdf_file_path (str): Path to the PDF file
         bucket_name (str): Name of the S3 bucket
         s3_key (str, optional): S3 object key. If None, uses the filename
+        part_size_mb (int): Multipart part size in MB
+        concurrency (int): Number of parts uploaded in parallel
+        s3_client (optional): S3 client to use. If None, uses the shared client
+        skip_validation (bool): Skip the existence and extension checks, for
+            callers that have already found the file in a directory listing
+        skip_existing (bool): Don't upload if the object already exists with the
+            same size and ETag
     
     Returns:
         bool: True if upload successful, False otherwise
     """
     
-    # Validate PDF file exists
-    if not os.path.exists(pdf_file_path):
-        print(f"Error: File {pdf_file_path} does not exist")
-        return False
+    if not skip_validation:
+        # Validate PDF file exists
+        if not os.path.exists(pdf_file_path):
+            print(f"Error: File {pdf_file_path} does not exist")
+            return False
+        
+        # Validate it's a PDF file
+        if not pdf_file_path.lower().endswith('.pdf'):
+            print(f"Error: File {pdf_file_path} is not a PDF file")
+            return False
     
-    # Validate it's a PDF file
-    if not pdf_file_path.lower().endswith('.pdf'):
-        print(f"Error: File {pdf_file_path} is not a PDF file")
+    # Check the file header so corrupt or mislabelled files are rejected here
+    # rather than after a full upload
+    try:
+        with open(pdf_file_path, 'rb') as f:
+            header = f.read(PDF_SIGNATURE_WINDOW)
+    except OSError as e:
+        print(f"Error: Could not read {pdf_file_path}: {e}")
+        return False
+    if PDF_SIGNATURE not in header:
+        print(f"Error: File {pdf_file_path} does not have a PDF header")
         return False
     
     # Set S3 key if not provided
@@ -34,12 +150,31 @@ def upload_pdf_to_s3(pdf_file_path, bucket_name, s3_key=None):
         s3_key = Path(pdf_file_path).name
     
     try:
-        # Create S3 client
-        s3_client = boto3.client('s3')
+        # Reuse the shared S3 client
+        if s3_client is None:
+            s3_client = get_s3_client()
+        
+        if skip_existing and is_already_uploaded(pdf_file_path, bucket_name, s3_key, s3_client,
+                                                 part_size_mb * 1024 * 1024):
+            print(f"✓ Skipping {pdf_file_path}: already at s3://{bucket_name}/{s3_key}")
+            return True
         
         # Upload file
         print(f"Uploading {pdf_file_path} to s3://{bucket_name}/{s3_key}...")
-        s3_client.upload_file(pdf_file_path, bucket_name, s3_key)
+        if os.path.getsize(pdf_file_path) < MULTIPART_THRESHOLD_MB * 1024 * 1024:
+            # Small files go up in one PutObject; upload_file would start a
+            # transfer manager and its thread pool just to make the same call
+            with open(pdf_file_path, 'rb') as f:
+                s3_client.put_object(Bucket=bucket_name, Key=s3_key, Body=f)
+        else:
+            from boto3.s3.transfer import TransferConfig
+            transfer_config = TransferConfig(
+                multipart_threshold=MULTIPART_THRESHOLD_MB * 1024 * 1024,
+                multipart_chunksize=part_size_mb * 1024 * 1024,
+                max_concurrency=concurrency,
+                use_threads=True
+            )
+            s3_client.upload_file(pdf_file_path, bucket_name, s3_key, Config=transfer_config)
         
         print(f"✓ Successfully uploaded {pdf_file_path} to S3")
         print(f"  S3 URI: s3://{bucket_name}/{s3_key}")
@@ -67,7 +202,31 @@ def upload_pdf_to_s3(pdf_file_path, bucket_name, s3_key=None):
         print(f"Unexpected error: {e}")
         return False
 
-def upload_multiple_pdfs(pdf_directory, bucket_name, s3_prefix=""):
+def enable_transfer_acceleration(bucket_name, s3_client=None):
+    """
+    Turn on S3 Transfer Acceleration for a bucket (safe to repeat)
+    
+    Args:
+        bucket_name (str): Name of the S3 bucket
+        s3_client (optional): S3 client to use. If None, uses the shared client
+    
+    Returns:
+        bool: True if acceleration is enabled, False otherwise
+    """
+    if s3_client is None:
+        s3_client = get_s3_client()
+    
+    try:
+        s3_client.put_bucket_accelerate_configuration(
+            Bucket=bucket_name,
+            AccelerateConfiguration={'Status': 'Enabled'})
+        print(f"✓ Transfer Acceleration enabled on bucket '{bucket_name}'")
+        return True
+    except ClientError as e:
+        print(f"Error enabling Transfer Acceleration on bucket '{bucket_name}': {e}")
+        return False
+
+def upload_multiple_pdfs(pdf_directory, bucket_name, s3_prefix="", s3_client=None):
     """
     Upload all PDF files from a directory to S3
     
@@ -75,8 +234,12 @@ def upload_multiple_pdfs(pdf_directory, bucket_name, s3_prefix=""):
         pdf_directory (str): Directory containing PDF files
         bucket_name (str): Name of the S3 bucket
         s3_prefix (str): Optional prefix for S3 keys
+        s3_client (optional): S3 client to use. If None, uses the shared client
     """
-    pdf_files = list(Path(pdf_directory).glob("*.pdf"))
+    # One directory pass; scandir entries know their type without an extra stat
+    with os.scandir(pdf_directory) as entries:
+        pdf_files = [entry for entry in entries
+                     if entry.is_file() and entry.name.lower().endswith('.pdf')]
     
     if not pdf_files:
         print(f"No PDF files found in {pdf_directory}")
@@ -84,46 +247,78 @@ def upload_multiple_pdfs(pdf_directory, bucket_name, s3_prefix=""):
     
     print(f"Found {len(pdf_files)} PDF files to upload")
     
+    # Upload several files at once through the shared client (boto3 clients
+    # are thread-safe). Files already in S3 unchanged are skipped, so re-running
+    # on a directory only sends new or modified PDFs
+    max_workers = min(MAX_PARALLEL_UPLOADS, len(pdf_files))
+    if s3_client is None:
+        s3_client = get_s3_client()
+    
     success_count = 0
-    for pdf_file in pdf_files:
-        s3_key = f"{s3_prefix}{pdf_file.name}" if s3_prefix else pdf_file.name
-        if upload_pdf_to_s3(str(pdf_file), bucket_name, s3_key):
-            success_count += 1
-        print()  # Add spacing between uploads
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for pdf_file in pdf_files:
+            s3_key = f"{s3_prefix}{pdf_file.name}" if s3_prefix else pdf_file.name
+            futures.append(executor.submit(upload_pdf_to_s3, pdf_file.path, bucket_name, s3_key,
+                                           s3_client=s3_client, skip_validation=True,
+                                           skip_existing=True))
+        
+        for future in as_completed(futures):
+            if future.result():
+                success_count += 1
+    
+    print()
     
     print(f"Upload complete: {success_count}/{len(pdf_files)} files uploaded successfully")
 
 def main():
-    if len(sys.argv) < 3:
+    # --accelerate may appear anywhere; the remaining arguments are positional
+    accelerate = "--accelerate" in sys.argv
+    argv = [arg for arg in sys.argv if arg != "--accelerate"]
+    
+    if len(argv) < 3:
         print("Usage:")
-        print("  Single file: python pdf_to_s3_uploader.py <pdf_file> <bucket_name> [s3_key]")
-        print("  Directory:   python pdf_to_s3_uploader.py --dir <pdf_directory> <bucket_name> [s3_prefix]")
+        print("  Single file: python pdf_to_s3_uploader.py [--accelerate] <pdf_file> <bucket_name> [s3_key]")
+        print("  Directory:   python pdf_to_s3_uploader.py [--accelerate] --dir <pdf_directory> <bucket_name> [s3_prefix]")
+        print()
+        print("Options:")
+        print("  --accelerate  Upload through S3 Transfer Acceleration (enables it on the bucket).")
+        print("                Faster from far-away regions, but billed per GB on top of")
+        print("                normal transfer; needs s3:PutAccelerateConfiguration.")
         print()
         print("Examples:")
         print("  python pdf_to_s3_uploader.py document.pdf my-bucket")
         print("  python pdf_to_s3_uploader.py document.pdf my-bucket custom/path/document.pdf")
         print("  python pdf_to_s3_uploader.py --dir ./pdfs my-bucket reports/")
+        print("  python pdf_to_s3_uploader.py --accelerate --dir ./pdfs my-bucket reports/")
         sys.exit(1)
     
-    if sys.argv[1] == "--dir":
-        # Directory upload
-        if len(sys.argv) < 4:
-            print("Error: Directory upload requires <pdf_directory> <bucket_name>")
+    if argv[1] == "--dir" and len(argv) < 4:
+        print("Error: Directory upload requires <pdf_directory> <bucket_name>")
+        sys.exit(1)
+    
+    s3_client = None
+    if accelerate:
+        bucket_name = argv[3] if argv[1] == "--dir" else argv[2]
+        if not enable_transfer_acceleration(bucket_name):
             sys.exit(1)
+        s3_client = get_s3_client(accelerate=True)
+    
+    if argv[1] == "--dir":
+        # Directory upload
+        pdf_directory = argv[2]
+        bucket_name = argv[3]
+        s3_prefix = argv[4] if len(argv) > 4 else ""
         
-        pdf_directory = sys.argv[2]
-        bucket_name = sys.argv[3]
-        s3_prefix = sys.argv[4] if len(sys.argv) > 4 else ""
-        
-        upload_multiple_pdfs(pdf_directory, bucket_name, s3_prefix)
+        upload_multiple_pdfs(pdf_directory, bucket_name, s3_prefix, s3_client=s3_client)
     
     else:
         # Single file upload
-        pdf_file = sys.argv[1]
-        bucket_name = sys.argv[2]
-        s3_key = sys.argv[3] if len(sys.argv) > 3 else None
+        pdf_file = argv[1]
+        bucket_name = argv[2]
+        s3_key = argv[3] if len(argv) > 3 else None
         
-        upload_pdf_to_s3(pdf_file, bucket_name, s3_key)
+        upload_pdf_to_s3(pdf_file, bucket_name, s3_key, s3_client=s3_client)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
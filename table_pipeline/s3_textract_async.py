@@ -1,68 +1,95 @@
 #!/usr/bin/env python3
 
-import boto3
 import json
+import os
 import sys
+import threading
 import time
+import uuid
 from botocore.exceptions import ClientError, NoCredentialsError
 from pathlib import Path
 
-class ProcessType:
-    DETECTION = 1
-    ANALYSIS = 2
+try:
+    import orjson
+except ImportError:  # fall back to the standard library json module
+    orjson = None
 
-class S3TextractProcessor:
-    def __init__(self, role_arn, bucket, document, region_name='us-east-2'):
-        """
-        Initialize the Textract processor using Amazon's recommended pattern
-        
-        Args:
-            role_arn (str): IAM role ARN for Textract to access S3 and SNS
-            bucket (str): S3 bucket containing the document
-            document (str): S3 key of the document
-            region_name (str): AWS region
-        """
-        self.roleArn = role_arn
-        self.bucket = bucket
-        self.document = document
-        self.region_name = region_name
-        self.jobId = ''
-        self.sqsQueueUrl = ''
-        self.snsTopicArn = ''
-        self.processType = ProcessType.ANALYSIS
-        
-        try:
-            self.textract = boto3.client('textract', region_name=region_name)
-            self.sqs = boto3.client('sqs', region_name=region_name)
-            self.sns = boto3.client('sns', region_name=region_name)
-            print(f"✓ Initialized Textract processor for s3://{bucket}/{document}")
-        except Exception as e:
-            print(f"Error initializing AWS clients: {e}")
-            raise
+from aws_clients import get_client
 
-    def create_topic_and_queue(self):
-        """Create SNS topic and SQS queue for notifications"""
-        millis = str(int(round(time.time() * 1000)))
+# Seconds between "still waiting" messages while a job runs
+PROGRESS_INTERVAL_SECONDS = 30
+
+# Delay before another job's notification on a shared queue becomes visible
+# again, so waiters do not pass it back and forth in a tight loop
+SHARED_QUEUE_RELEASE_SECONDS = 1
+
+# Jobs still waiting on each shared queue (queue URL -> job IDs). Notifications
+# for jobs not listed here have no waiter left, e.g. because its worker failed,
+# and are deleted instead of being handed back forever
+_active_jobs = {}
+_active_jobs_lock = threading.Lock()
+
+# Result pages requested per second across all jobs in this process; matches
+# the default GetDocumentAnalysis quota in most regions
+RESULTS_REQUESTS_PER_SECOND = 5
+
+class RateLimiter:
+    """Space calls evenly so that at most `rate` start per second, across threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.nextSlot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.nextSlot, now)
+            self.nextSlot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# Shared by every processor, so concurrent jobs draining results stay under the quota
+_results_rate_limiter = RateLimiter(RESULTS_REQUESTS_PER_SECOND)
+
+def create_topic_and_queue(sns, sqs):
+    """
+    Create an SNS topic for Textract notifications and an SQS queue subscribed to it
+    
+    Args:
+        sns: boto3 SNS client
+        sqs: boto3 SQS client
+    
+    Returns:
+        tuple: (SNS topic ARN, SQS queue URL)
+    """
+    # Anything created before a failure is removed again, so a failed setup
+    # never leaves a topic or queue behind
+    snsTopicArn = None
+    sqsQueueUrl = None
+    try:
+        # The random suffix keeps names unique when several documents are
+        # processed at the same time
+        millis = str(int(round(time.time() * 1000))) + uuid.uuid4().hex[:8]
 
         # Create SNS topic
         snsTopicName = "AmazonTextractTopic" + millis
-        topicResponse = self.sns.create_topic(Name=snsTopicName)
-        self.snsTopicArn = topicResponse['TopicArn']
+        topicResponse = sns.create_topic(Name=snsTopicName)
+        snsTopicArn = topicResponse['TopicArn']
         print(f"✓ Created SNS topic: {snsTopicName}")
 
         # Create SQS queue
         sqsQueueName = "AmazonTextractQueue" + millis
-        self.sqs.create_queue(QueueName=sqsQueueName)
-        self.sqsQueueUrl = self.sqs.get_queue_url(QueueName=sqsQueueName)['QueueUrl']
+        sqsQueueUrl = sqs.create_queue(QueueName=sqsQueueName)['QueueUrl']
         print(f"✓ Created SQS queue: {sqsQueueName}")
 
-        attribs = self.sqs.get_queue_attributes(QueueUrl=self.sqsQueueUrl,
-                                               AttributeNames=['QueueArn'])['Attributes']
+        attribs = sqs.get_queue_attributes(QueueUrl=sqsQueueUrl,
+                                           AttributeNames=['QueueArn'])['Attributes']
         sqsQueueArn = attribs['QueueArn']
 
         # Subscribe SQS queue to SNS topic
-        self.sns.subscribe(
-            TopicArn=self.snsTopicArn,
+        sns.subscribe(
+            TopicArn=snsTopicArn,
             Protocol='sqs',
             Endpoint=sqsQueueArn)
 
@@ -83,28 +110,113 @@ class S3TextractProcessor:
       }}
     }}
   ]
-}}""".format(sqsQueueArn, self.snsTopicArn)
+}}""".format(sqsQueueArn, snsTopicArn)
 
-        self.sqs.set_queue_attributes(
-            QueueUrl=self.sqsQueueUrl,
+        sqs.set_queue_attributes(
+            QueueUrl=sqsQueueUrl,
             Attributes={'Policy': policy})
 
-    def delete_topic_and_queue(self):
-        """Clean up SNS topic and SQS queue"""
+        return snsTopicArn, sqsQueueUrl
+    except Exception:
+        delete_topic_and_queue(sns, sqs, snsTopicArn, sqsQueueUrl)
+        raise
+
+def delete_topic_and_queue(sns, sqs, snsTopicArn, sqsQueueUrl):
+    """Clean up SNS topic and SQS queue (either may be None if it was never created)"""
+    try:
+        if sqsQueueUrl:
+            sqs.delete_queue(QueueUrl=sqsQueueUrl)
+        if snsTopicArn:
+            sns.delete_topic(TopicArn=snsTopicArn)
+        print("✓ Cleaned up SNS topic and SQS queue")
+    except Exception as e:
+        print(f"Warning: Error cleaning up resources: {e}")
+
+class TextractNotificationChannel:
+    """
+    One SNS topic and SQS queue shared by several Textract jobs
+    
+    Use as a context manager around a batch and pass sns_topic_arn and
+    sqs_queue_url to each S3TextractProcessor. Each processor only consumes
+    notifications for its own job, so the jobs can run concurrently.
+    """
+
+    def __init__(self, region_name='us-east-2'):
+        self.sns = get_client('sns', region_name)
+        self.sqs = get_client('sqs', region_name)
+        self.snsTopicArn = ''
+        self.sqsQueueUrl = ''
+
+    def __enter__(self):
+        # __exit__ does not run if this raises; create_topic_and_queue deletes
+        # whatever it had created before re-raising, so nothing is leaked
+        self.snsTopicArn, self.sqsQueueUrl = create_topic_and_queue(self.sns, self.sqs)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with _active_jobs_lock:
+            _active_jobs.pop(self.sqsQueueUrl, None)
+        delete_topic_and_queue(self.sns, self.sqs, self.snsTopicArn, self.sqsQueueUrl)
+        return False
+
+class ProcessType:
+    DETECTION = 1
+    ANALYSIS = 2
+
+class S3TextractProcessor:
+    def __init__(self, role_arn, bucket, document, region_name='us-east-2', wait_time_seconds=20,
+                 sns_topic_arn=None, sqs_queue_url=None):
+        """
+        Initialize the Textract processor using Amazon's recommended pattern
+        
+        Args:
+            role_arn (str): IAM role ARN for Textract to access S3 and SNS
+            bucket (str): S3 bucket containing the document
+            document (str): S3 key of the document
+            region_name (str): AWS region
+            wait_time_seconds (int): SQS long-poll window, 1-20 seconds
+            sns_topic_arn (str, optional): Existing notification topic, e.g. from a
+                                           TextractNotificationChannel
+            sqs_queue_url (str, optional): Existing queue subscribed to sns_topic_arn
+        """
+        self.roleArn = role_arn
+        self.bucket = bucket
+        self.document = document
+        self.region_name = region_name
+        self.waitTimeSeconds = wait_time_seconds
+        self.jobId = ''
+        self.sqsQueueUrl = sqs_queue_url or ''
+        self.snsTopicArn = sns_topic_arn or ''
+        # Topic and queue passed in by the caller are not ours to delete
+        self.ownsTopicAndQueue = not (sns_topic_arn and sqs_queue_url)
+        self.processType = ProcessType.ANALYSIS
+        
         try:
-            self.sqs.delete_queue(QueueUrl=self.sqsQueueUrl)
-            self.sns.delete_topic(TopicArn=self.snsTopicArn)
-            print("✓ Cleaned up SNS topic and SQS queue")
+            self.textract = get_client('textract', region_name)
+            self.sqs = get_client('sqs', region_name)
+            self.sns = get_client('sns', region_name)
+            print(f"✓ Initialized Textract processor for s3://{bucket}/{document}")
         except Exception as e:
-            print(f"Warning: Error cleaning up resources: {e}")
+            print(f"Error initializing AWS clients: {e}")
+            raise
+
+    def create_topic_and_queue(self):
+        """Create SNS topic and SQS queue for notifications"""
+        self.snsTopicArn, self.sqsQueueUrl = create_topic_and_queue(self.sns, self.sqs)
 
-    def process_document(self, process_type=ProcessType.ANALYSIS, feature_types=None):
+    def delete_topic_and_queue(self):
+        """Clean up SNS topic and SQS queue"""
+        delete_topic_and_queue(self.sns, self.sqs, self.snsTopicArn, self.sqsQueueUrl)
+
+    def process_document(self, process_type=ProcessType.ANALYSIS, feature_types=None, output_file=None):
         """
         Start document processing and wait for completion
         
         Args:
             process_type: ProcessType.DETECTION or ProcessType.ANALYSIS
             feature_types: List of features for analysis (TABLES, FORMS, etc.)
+            output_file (str): If given, results are streamed to this file
+                               instead of being returned with all blocks
         """
         if feature_types is None:
             feature_types = ["TABLES", "FORMS"]
@@ -130,48 +242,77 @@ class S3TextractProcessor:
 
             self.jobId = response['JobId']
             print(f'Job ID: {self.jobId}')
-
-            # Wait for job completion via SQS notifications
+            if not self.ownsTopicAndQueue:
+                # Registered before any notification can arrive: Textract only
+                # publishes once the job has finished
+                with _active_jobs_lock:
+                    _active_jobs.setdefault(self.sqsQueueUrl, set()).add(self.jobId)
+
+            # Wait for job completion via SQS notifications. Long polling
+            # returns as soon as the notification arrives, so there is no
+            # sleep between polls.
             print('Waiting for job completion...')
-            dotLine = 0
+            waitStart = time.monotonic()
+            lastProgress = waitStart
             
             while not jobFound:
                 sqsResponse = self.sqs.receive_message(
                     QueueUrl=self.sqsQueueUrl,
                     MessageAttributeNames=['ALL'],
-                    MaxNumberOfMessages=10)
+                    MaxNumberOfMessages=10,
+                    WaitTimeSeconds=self.waitTimeSeconds)
 
                 if 'Messages' not in sqsResponse:
-                    if dotLine < 40:
-                        print('.', end='')
-                        dotLine += 1
-                    else:
-                        print()
-                        dotLine = 0
-                    sys.stdout.flush()
-                    time.sleep(5)
+                    now = time.monotonic()
+                    if now - lastProgress >= PROGRESS_INTERVAL_SECONDS:
+                        print(f"Waiting on job {self.jobId}, elapsed={int(now - waitStart)}s")
+                        lastProgress = now
                     continue
 
-                for message in sqsResponse['Messages']:
-                    notification = json.loads(message['Body'])
-                    textMessage = json.loads(notification['Message'])
-                    
-                    print(f"\nJob Status: {textMessage['Status']}")
+                jobFailed = False
+                deleteEntries = []
+                releaseEntries = []
+                loads = orjson.loads if orjson else json.loads
+                for i, message in enumerate(sqsResponse['Messages']):
+                    notification = loads(message['Body'])
+                    textMessage = loads(notification['Message'])
+                    entry = {'Id': str(i), 'ReceiptHandle': message['ReceiptHandle']}
                     
                     if str(textMessage['JobId']) == self.jobId:
+                        print(f"Job Status: {textMessage['Status']}")
                         print(f'✓ Job completed: {textMessage["JobId"]}')
                         if textMessage['Status'] == 'SUCCEEDED':
                             jobFound = True
-                            return self.get_results(textMessage['JobId'])
                         elif textMessage['Status'] == 'FAILED':
                             print(f"✗ Job failed: {textMessage.get('StatusMessage', 'Unknown error')}")
-                            return None
-                    else:
+                            jobFailed = True
+                        deleteEntries.append(entry)
+                    elif self.ownsTopicAndQueue:
                         print(f"Different job completed: {textMessage['JobId']}")
-                    
-                    # Delete the message
-                    self.sqs.delete_message(QueueUrl=self.sqsQueueUrl,
-                                          ReceiptHandle=message['ReceiptHandle'])
+                        deleteEntries.append(entry)
+                    else:
+                        with _active_jobs_lock:
+                            waiting = str(textMessage['JobId']) in _active_jobs.get(self.sqsQueueUrl, ())
+                        if waiting:
+                            # Another job on the shared queue; hand the message back
+                            releaseEntries.append(dict(entry, VisibilityTimeout=SHARED_QUEUE_RELEASE_SECONDS))
+                        else:
+                            print(f"Discarding notification for job {textMessage['JobId']} with no waiter")
+                            deleteEntries.append(entry)
+                
+                # Delete the whole batch of messages in one call
+                if deleteEntries:
+                    self.sqs.delete_message_batch(QueueUrl=self.sqsQueueUrl, Entries=deleteEntries)
+                if releaseEntries:
+                    self.sqs.change_message_visibility_batch(QueueUrl=self.sqsQueueUrl,
+                                                             Entries=releaseEntries)
+                
+                if jobFound:
+                    if output_file:
+                        return self.stream_results_to_file(self.jobId, output_file)
+                    return self.get_results(self.jobId)
+                if jobFailed:
+                    return None
 
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -185,8 +326,42 @@ class S3TextractProcessor:
                 print(f"Error starting analysis: {e}")
             raise
 
+        finally:
+            if not self.ownsTopicAndQueue and self.jobId:
+                with _active_jobs_lock:
+                    _active_jobs.get(self.sqsQueueUrl, set()).discard(self.jobId)
+
         return None
 
+    def iter_result_pages(self, jobId):
+        """
+        Yield the result pages of a completed job in order
+        
+        Args:
+            jobId (str): Job ID of completed job
+        
+        Yields:
+            dict: One get_document_* response (up to 1000 blocks)
+        """
+        maxResults = 1000
+
+        # Textract has no boto3 paginator for these calls, and each request
+        # needs the previous response's NextToken, so pages are fetched in order
+        if self.processType == ProcessType.ANALYSIS:
+            get_page = self.textract.get_document_analysis
+        else:
+            get_page = self.textract.get_document_text_detection
+
+        request = {'JobId': jobId, 'MaxResults': maxResults}
+        while True:
+            _results_rate_limiter.wait()
+            response = get_page(**request)
+            yield response
+
+            if 'NextToken' not in response:
+                break
+            request['NextToken'] = response['NextToken']
+
     def get_results(self, jobId):
         """
         Retrieve complete results from completed job
@@ -198,37 +373,10 @@ class S3TextractProcessor:
             dict: Complete analysis results
         """
         print("Retrieving results...")
-        maxResults = 1000
-        paginationToken = None
-        finished = False
         all_blocks = []
 
-        while not finished:
-            response = None
-
-            if self.processType == ProcessType.ANALYSIS:
-                if paginationToken is None:
-                    response = self.textract.get_document_analysis(
-                        JobId=jobId, MaxResults=maxResults)
-                else:
-                    response = self.textract.get_document_analysis(
-                        JobId=jobId, MaxResults=maxResults, NextToken=paginationToken)
-
-            elif self.processType == ProcessType.DETECTION:
-                if paginationToken is None:
-                    response = self.textract.get_document_text_detection(
-                        JobId=jobId, MaxResults=maxResults)
-                else:
-                    response = self.textract.get_document_text_detection(
-                        JobId=jobId, MaxResults=maxResults, NextToken=paginationToken)
-
-            blocks = response['Blocks']
-            all_blocks.extend(blocks)
-
-            if 'NextToken' in response:
-                paginationToken = response['NextToken']
-            else:
-                finished = True
+        for response in self.iter_result_pages(jobId):
+            all_blocks.extend(response['Blocks'])
 
         print(f'✓ Retrieved {len(all_blocks)} blocks from {response["DocumentMetadata"]["Pages"]} pages')
 
@@ -241,45 +389,95 @@ class S3TextractProcessor:
             'total_blocks': len(all_blocks)
         }
 
-    def save_results_to_file(self, results, output_file):
-        """Save results to JSON file"""
+    def stream_results_to_file(self, jobId, output_file):
+        """
+        Write a completed job's blocks to file page by page as they are retrieved
+        
+        Only one result page is held in memory at a time. The file holds
+        {"DocumentMetadata": ..., "Blocks": [...]} as read by extract_table_raw.py,
+        or one block per line (NDJSON) for .jsonl paths.
+        
+        Args:
+            jobId (str): Job ID of completed job
+            output_file (str): File to save results
+        
+        Returns:
+            dict: Job results without the 'blocks' list
+        """
+        print("Retrieving results...")
+        ndjson = output_file.endswith('.jsonl')
+        if orjson:
+            dumps = lambda obj: orjson.dumps(obj, default=str)
+        else:
+            dumps = lambda obj: json.dumps(obj, default=str).encode()
+        total_blocks = 0
+        metadata = None
+
+        # Write to a temporary file and move it into place after the last page,
+        # so a failure part way through never leaves a truncated result file
+        temp_file = output_file + '.tmp'
         try:
-            # Convert to format compatible with your existing extract_table_raw.py
-            output_data = {
-                'DocumentMetadata': results['document_metadata'],
-                'Blocks': results['blocks']
-            }
-            
-            with open(output_file, 'w') as f:
-                json.dump(output_data, f, indent=2, default=str)
-            print(f"✓ Results saved to: {output_file}")
-        except Exception as e:
-            print(f"Error saving results: {e}")
+            with open(temp_file, 'wb') as f:
+                for response in self.iter_result_pages(jobId):
+                    if metadata is None:
+                        metadata = response['DocumentMetadata']
+                        if not ndjson:
+                            f.write(b'{"DocumentMetadata": ')
+                            f.write(dumps(metadata))
+                            f.write(b', "Blocks": [')
+
+                    for block in response['Blocks']:
+                        if ndjson:
+                            f.write(dumps(block))
+                            f.write(b'\n')
+                        else:
+                            if total_blocks:
+                                f.write(b', ')
+                            f.write(dumps(block))
+                        total_blocks += 1
+
+                if not ndjson:
+                    f.write(b']}')
+            os.replace(temp_file, output_file)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
             raise
 
+        print(f'✓ Retrieved {total_blocks} blocks from {metadata["Pages"]} pages')
+        print(f"✓ Results saved to: {output_file}")
+
+        return {
+            'job_id': jobId,
+            'job_status': 'SUCCEEDED',
+            'document_metadata': metadata,
+            'total_blocks': total_blocks
+        }
+
     def process_document_complete_workflow(self, output_file=None, process_type=ProcessType.ANALYSIS, feature_types=None):
         """
         Complete workflow: create queue, process document, get results, cleanup
         
+        When the processor was given a shared topic and queue, they are used
+        as is and left in place for the other jobs.
+        
         Args:
             output_file (str): File to save results
             process_type: DETECTION or ANALYSIS
             feature_types: Features to extract for analysis
         
         Returns:
-            dict: Complete analysis results
+            dict: Analysis results (without the 'blocks' list when output_file is given)
         """
+        if not self.ownsTopicAndQueue:
+            return self.process_document(process_type, feature_types, output_file)
+
         try:
             # Setup
             self.create_topic_and_queue()
             
-            # Process document
-            results = self.process_document(process_type, feature_types)
-            
-            if results and output_file:
-                self.save_results_to_file(results, output_file)
-                
-            return results
+            # Process document, streaming the results to output_file if given
+            return self.process_document(process_type, feature_types, output_file)
             
         finally:
             # Always cleanup